@@ -1,26 +1,57 @@
 from flask import Flask, render_template, request, flash, session, redirect, url_for, jsonify
-from blockchain import Blockchain
+from markupsafe import Markup
+from werkzeug.middleware.proxy_fix import ProxyFix
+from blockchain import Blockchain, ShardedBlockchain
+from fragment_cache import ChainListing, FragmentCache
+import assets
 import hashlib
 import os
 import json
 import time
 import urllib.request
 from datetime import datetime, timezone, timedelta
-from werkzeug.security import generate_password_hash, check_password_hash
-import pyqrcode
 import io
 import base64
 
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-
-from db import users_collection, requests_collection
+# Heavy or rarely needed modules (pymongo, cloudinary, pyqrcode, Pillow)
+# are imported where they are used so that workers boot
+# and answer /health quickly. See benchmarks/import_profile.py.
+from db import get_users_collection, get_requests_collection
+from storage import upload_blob, find_resource_url
+from images import schedule_derivatives, derivative_url
+from passwords import PasswordHashBusy, hash_password, verify_password, needs_rehash, login_limiter
+from qr_links import SECRET_KEY, sign_qr_link, check_qr_link
 
 # Cloudinary automatically configures itself using the CLOUDINARY_URL from .env
 app = Flask(__name__)
-app.secret_key = os.environ.get('SECRET_KEY', 'docuchain_offline_demo_secret')
-blockchain = Blockchain()
+app.secret_key = SECRET_KEY
+# Deployed behind a TLS-terminating proxy: trust its X-Forwarded-Proto/Host so
+# external URLs (the links printed in QR codes) use the public https address
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 1))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=TRUSTED_PROXIES, x_host=TRUSTED_PROXIES)
+# Content-hashed static URLs with immutable caching, and gzip for large pages
+assets.init_app(app)
+
+_blockchain = None
+
+def get_blockchain():
+    global _blockchain
+    if _blockchain is None:
+        # Sharded mode: per-issuer sub-chains anchored into the global chain
+        if os.environ.get('DOCUCHAIN_SHARDED') == '1':
+            _blockchain = ShardedBlockchain()
+        else:
+            _blockchain = Blockchain()
+    return _blockchain
+
+def get_loaded_blockchain():
+    # Sharded mode appends via sub-chain heads and answers lookups with indexed
+    # queries, so it skips reading the whole global chain
+    blockchain = get_blockchain()
+    if not isinstance(blockchain, ShardedBlockchain):
+        blockchain.load_chain()
+    return blockchain
 
 @app.template_filter('formatdatetime')
 def format_datetime(value):
@@ -29,17 +60,44 @@ def format_datetime(value):
     # Formats to: February 28, 2026 - 06:30 PM
     return datetime.fromtimestamp(value).strftime('%B %d, %Y - %I:%M %p')
 
+@app.template_filter('photo_url')
+def photo_url_filter(value, size=None):
+    # Holder photos / avatars are either Cloudinary URLs or legacy local uploads
+    if not value:
+        return ""
+    if '://' not in value:
+        return url_for('static', filename='uploads/' + value)
+    return derivative_url(value, size) if size else value
+
 # Ensure uploads directory exists on cloud environment
 os.makedirs(os.path.join(app.root_path, 'static', 'uploads'), exist_ok=True)
 
 def calculate_file_hash(file_data):
     return hashlib.sha256(file_data).hexdigest()
 
+def make_qr_base64(qr_data):
+    import pyqrcode
+    qr = pyqrcode.create(qr_data)
+    buffer = io.BytesIO()
+    qr.svg(buffer, scale=4, background="white", module_color="#1E3A8A")
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+def make_verification_qr(block):
+    # The QR holds a short link to /c/<cert_id> (plus a signed hash prefix, see
+    # qr_links.py), so a scan resolves with one indexed read instead of a file
+    # upload
+    token = sign_qr_link(block.cert_id, block.document_hash)
+    if token:
+        url = url_for('resolve_cert', cert_id=block.cert_id, s=token, _external=True)
+    else:
+        url = url_for('resolve_cert', cert_id=block.cert_id, _external=True)
+    return make_qr_base64(url)
+
 @app.context_processor
 def inject_user_data():
     if 'user' in session:
         try:
-            user_data = users_collection.find_one({"_id": session['user']}) or {}
+            user_data = get_users_collection().find_one({"_id": session['user']}) or {}
             return dict(current_user=user_data)
         except Exception:
             return dict(current_user=None)
@@ -89,33 +147,34 @@ def issue():
         # Rewind file pointer for Cloudinary upload
         file.seek(0)
         
-        # Upload the original issued document to Cloudinary
-        upload_result = cloudinary.uploader.upload(
+        # Upload the original issued document to Cloudinary (skipped if already stored)
+        doc_url = upload_blob(
             file, 
             resource_type='auto',
             public_id=f"doc_{doc_hash}",
             folder="docuchain/documents"
         )
-        doc_url = upload_result.get('secure_url')
         
         # 2. Process and Hash Photo (Immutable Photo Upload)
         photo_data = photo.read()
         photo_hash = calculate_file_hash(photo_data)
         
         photo.seek(0)
-        # Save photo purely by its cryptographic identity
-        photo_upload_result = cloudinary.uploader.upload(
+        # Save photo purely by its cryptographic identity; a photo reused
+        # across certificates is only transferred once
+        photo_url = upload_blob(
             photo,
             folder="docuchain/photos",
             public_id=f"{photo_hash}"
         )
-        photo_url = photo_upload_result.get('secure_url')
+        # Thumbnails for the dashboard/document pages are built in the background
+        schedule_derivatives(photo_data, photo_hash)
             
         # 3. Auto-generate unique Cert ID
         cert_id = hashlib.md5((student_name + str(doc_hash)).encode()).hexdigest()[:8].upper()
         
         # Ensure fresh load from file before adding
-        blockchain.load_chain()
+        blockchain = get_loaded_blockchain()
         # Note: We now store the photo URL instead of just the filename
         new_block = blockchain.add_block(doc_type, issuer, doc_hash, student_name, cert_id, validity, student_image=photo_url)
         
@@ -133,7 +192,7 @@ def request_verification():
         flash("You must be logged in as a Holder to request verification.", "warning")
         return redirect(url_for('login'))
         
-    issuers = [{"username": u["_id"], "data": u} for u in users_collection.find({"role": "Issuer"})]
+    issuers = [{"username": u["_id"], "data": u} for u in get_users_collection().find({"role": "Issuer"})]
         
     if request.method == 'POST':
         if 'document' not in request.files:
@@ -156,25 +215,24 @@ def request_verification():
         doc_hash = calculate_file_hash(file_data)
         
         # Duplicate check: prevent requesting verification if already anchored
-        blockchain.load_chain()
+        blockchain = get_loaded_blockchain()
         if blockchain.find_document_hash(doc_hash):
             flash("This exact document has already been authenticated on the blockchain.", "warning")
             return redirect(request.url)
         
         # Upload file to Cloudinary
         file.seek(0)
-        upload_result = cloudinary.uploader.upload(
+        file_url = upload_blob(
             file,
             resource_type='auto',
             public_id=f"req_{doc_hash[:16]}",
             folder="docuchain/requests"
         )
-        file_url = upload_result.get('secure_url')
             
         req_id = f"REQ-{doc_hash[:8].upper()}"
         
 
-        requests_collection.insert_one({
+        get_requests_collection().insert_one({
             "_id": req_id,
             "holder": session.get('user'),
             "target_issuer": target_issuer,
@@ -195,7 +253,7 @@ def approve_request(req_id):
         flash("Unauthorized.", "danger")
         return redirect(url_for('login'))
         
-    req = requests_collection.find_one({"_id": req_id})
+    req = get_requests_collection().find_one({"_id": req_id})
     if not req:
         flash("Request not found.", "danger")
         return redirect(url_for('dashboard'))
@@ -216,19 +274,19 @@ def approve_request(req_id):
     doc_hash = calculate_file_hash(file_data)
         
     # Add to blockchain
-    blockchain.load_chain()
+    blockchain = get_loaded_blockchain()
     
     # Check if already issued
     existing = blockchain.find_document_hash(doc_hash)
     if existing:
         flash("This document is already verified on the blockchain.", "warning")
-        requests_collection.update_one({"_id": req_id}, {"$set": {"status": "Approved"}})
+        get_requests_collection().update_one({"_id": req_id}, {"$set": {"status": "Approved"}})
         return redirect(url_for('dashboard'))
     
 
     cert_id = f"VERIFIED-{int(time.time())}"
     
-    holder_data = users_collection.find_one({"_id": req['holder']}) or {}
+    holder_data = get_users_collection().find_one({"_id": req['holder']}) or {}
     student_image = holder_data.get('avatar', 'placeholder_avatar.svg')
     
     blockchain.add_block(
@@ -241,7 +299,7 @@ def approve_request(req_id):
         student_image=student_image
     )
     
-    requests_collection.update_one({"_id": req_id}, {"$set": {"status": "Approved"}})
+    get_requests_collection().update_one({"_id": req_id}, {"$set": {"status": "Approved"}})
     
     flash(f"Successfully verified and anchored {req['holder']}'s document to the blockchain.", "success")
     return redirect(url_for('dashboard'))
@@ -252,7 +310,7 @@ def reject_request(req_id):
         flash("Unauthorized.", "danger")
         return redirect(url_for('login'))
         
-    req = requests_collection.find_one({"_id": req_id})
+    req = get_requests_collection().find_one({"_id": req_id})
     if not req:
         flash("Request not found.", "danger")
         return redirect(url_for('dashboard'))
@@ -261,7 +319,7 @@ def reject_request(req_id):
         flash("You are not authorized to reject this request.", "danger")
         return redirect(url_for('dashboard'))
         
-    requests_collection.update_one({"_id": req_id}, {"$set": {"status": "Rejected"}})
+    get_requests_collection().update_one({"_id": req_id}, {"$set": {"status": "Rejected"}})
     
     flash("Verification request rejected.", "info")
     return redirect(url_for('dashboard'))
@@ -281,9 +339,8 @@ def verify():
         file_data = file.read()
         calculated_hash = calculate_file_hash(file_data)
         
-        # Reload chain to ensure we have latest records
-        blockchain.load_chain()
-        matching_block = blockchain.find_document_hash(calculated_hash)
+        # Indexed lookup sees newly issued blocks without reloading the chain
+        matching_block = get_blockchain().lookup('document_hash', calculated_hash)
         
         qr_base64 = None
         formatted_date = None
@@ -291,19 +348,7 @@ def verify():
             ist = timezone(timedelta(hours=5, minutes=30))
             formatted_date = datetime.fromtimestamp(matching_block.timestamp, ist).strftime('%B %d, %Y')
             
-            # Generate QR Code containing metadata
-            qr_data = (f"DocuChain Verified\n"
-                       f"Holder: {matching_block.student_name}\n"
-                       f"ID: {matching_block.cert_id}\n"
-                       f"Issuer: {matching_block.issuer}\n"
-                       f"Issued: {formatted_date}\n"
-                       f"Validity: {matching_block.validity}\n"
-                       f"Hash: {matching_block.document_hash[:16]}...")
-            
-            qr = pyqrcode.create(qr_data)
-            buffer = io.BytesIO()
-            qr.svg(buffer, scale=4, background="white", module_color="#1E3A8A")
-            qr_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            qr_base64 = make_verification_qr(matching_block)
         
         return render_template('verify.html', 
                                calculated_hash=calculated_hash, 
@@ -313,40 +358,86 @@ def verify():
         
     return render_template('verify.html')
 
+def censor_issuer(issuer):
+    # Keep first & last letter of each word
+    censored_words = []
+    for word in issuer.split():
+        if len(word) > 2:
+            censored_words.append(word[0] + '*' * (len(word) - 2) + word[-1])
+        elif len(word) == 2:
+            censored_words.append(word[0] + '*')
+        else:
+            censored_words.append(word)
+    return ' '.join(censored_words)
+
+def render_chain_block(block, variant):
+    b_dict = block.to_dict()
+
+    # Privacy Censorship for unauthenticated users
+    if variant == 'censored' and block.index != 0:
+        b_dict['issuer'] = censor_issuer(block.issuer)
+        b_dict['formatted_timestamp'] = '*** ** **** - **:** **'
+    else:
+        ist = timezone(timedelta(hours=5, minutes=30))
+        b_dict['formatted_timestamp'] = datetime.fromtimestamp(block.timestamp, ist).strftime('%B %d, %Y - %I:%M %p')
+
+    # Rendered straight from the Jinja environment: render_template would run
+    # the context processors (a users lookup) once per block
+    return app.jinja_env.get_template('chain_block.html').render(block=b_dict)
+
+_chain_listing = None
+
+def get_chain_listing():
+    global _chain_listing
+    if _chain_listing is None:
+        _chain_listing = ChainListing(
+            render_chain_block,
+            separator=app.jinja_env.get_template('chain_link.html').render(),
+            fragments=FragmentCache(int(os.environ.get('CHAIN_FRAGMENT_CACHE_SIZE', 20000))),
+        )
+    return _chain_listing
+
+# Gzipped /chain pages keyed by chain tip, variant and the surrounding page
+_compressed_chain_pages = None
+CHAIN_BLOCKS_PLACEHOLDER = '<!-- docuchain:chain-blocks -->'
+
+def get_compressed_chain_pages():
+    global _compressed_chain_pages
+    if _compressed_chain_pages is None:
+        _compressed_chain_pages = FragmentCache(int(os.environ.get('CHAIN_GZIP_CACHE_SIZE', 16)))
+    return _compressed_chain_pages
+
 @app.route('/chain')
 def chain():
+    blockchain = get_blockchain()
     blockchain.load_chain()
     is_valid = blockchain.verify_chain()
-    
-    chain_data = []
-    ist = timezone(timedelta(hours=5, minutes=30))
-    is_logged_in = 'user' in session
-    
-    for b in blockchain.chain:
-        b_dict = b.to_dict()
-        formatted_date = datetime.fromtimestamp(b.timestamp, ist).strftime('%B %d, %Y - %I:%M %p')
-        
-        # Privacy Censorship for unauthenticated users
-        if not is_logged_in and b.index != 0:
-            # Censor Issuer Name (Keep first & last letter of each word)
-            censored_words = []
-            for word in b.issuer.split():
-                if len(word) > 2:
-                    censored_words.append(word[0] + '*' * (len(word) - 2) + word[-1])
-                elif len(word) == 2:
-                    censored_words.append(word[0] + '*')
-                else:
-                    censored_words.append(word)
-            b_dict['issuer'] = ' '.join(censored_words)
-                
-            # Censor Timestamp
-            b_dict['formatted_timestamp'] = '*** ** **** - **:** **'
-        else:
-            b_dict['formatted_timestamp'] = formatted_date
-            
-        chain_data.append(b_dict)
-        
-    return render_template('chain.html', chain=chain_data, is_valid=is_valid)
+    variant = 'full' if 'user' in session else 'censored'
+
+    chain_listing = get_chain_listing()
+    if is_valid and blockchain.chain and assets.accepts_gzip():
+        # Gzipping the full page costs ~80ms at 10k blocks, so the compressed
+        # page is cached and only rebuilt when the chain tip or the rest of the
+        # page (navbar, flashed messages) changes
+        shell = render_template('chain.html', blocks_html=Markup(CHAIN_BLOCKS_PLACEHOLDER), is_valid=is_valid)
+        tip = blockchain.chain[-1]
+        key = (variant, len(blockchain.chain), tip.block_hash, hashlib.sha256(shell.encode()).hexdigest())
+        compressed_pages = get_compressed_chain_pages()
+        compressed = compressed_pages.get(key)
+        if compressed is None:
+            page = shell.replace(CHAIN_BLOCKS_PLACEHOLDER, chain_listing.render(blockchain.chain, variant), 1)
+            compressed = assets.gzip_bytes(page.encode())
+            compressed_pages.set(key, compressed)
+        return assets.gzip_response(compressed)
+
+    if is_valid:
+        blocks_html = chain_listing.render(blockchain.chain, variant)
+    else:
+        # Stored block hashes can't be trusted as cache keys on a tampered chain
+        blocks_html = chain_listing.separator.join(
+            render_chain_block(b, variant) for b in reversed(blockchain.chain))
+
+    return render_template('chain.html', blocks_html=Markup(blocks_html), is_valid=is_valid)
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -357,14 +448,37 @@ def login():
         username = request.form.get('username')
         password = request.form.get('password')
         
-        user = users_collection.find_one({"_id": username})
+        # Refuse before hashing anything so guessing can't tie up the hash pool
+        retry_after = login_limiter.retry_after(username)
+        if retry_after:
+            flash(f"Too many failed login attempts. Please try again in {retry_after // 60 + 1} minutes.", 'danger')
+            return redirect(url_for('login'))
+        
+        user = get_users_collection().find_one({"_id": username})
+        
         # Ensure user exists and the password matches the stored hash
-        if user and check_password_hash(user.get('password', ''), password):
+        try:
+            password_ok = bool(user) and verify_password(user.get('password', ''), password)
+        except PasswordHashBusy:
+            flash("The server is busy right now. Please try again in a moment.", 'warning')
+            return redirect(url_for('login'))
+            
+        if password_ok:
+            login_limiter.reset(username)
+            
+            # Upgrade hashes made with older work-factor settings
+            if needs_rehash(user.get('password')):
+                try:
+                    get_users_collection().update_one({"_id": username}, {"$set": {"password": hash_password(password)}})
+                except PasswordHashBusy:
+                    pass
+            
             session['user'] = username
             session['role'] = user.get('role', 'Holder')
             flash(f"Welcome back, {username}!", 'success')
             return redirect(url_for('dashboard'))
         else:
+            login_limiter.record_failure(username)
             flash('Invalid username or password.', 'danger')
             return redirect(url_for('login'))
             
@@ -384,13 +498,19 @@ def register():
             flash("Username and password are required.", "warning")
             return redirect(url_for('register'))
             
-        if users_collection.find_one({"_id": username}):
+        if get_users_collection().find_one({"_id": username}):
             flash("Username already registered.", "danger")
             return redirect(url_for('register'))
             
-        users_collection.insert_one({
+        try:
+            password_hash = hash_password(password)
+        except PasswordHashBusy:
+            flash("The server is busy right now. Please try again in a moment.", "warning")
+            return redirect(url_for('register'))
+            
+        get_users_collection().insert_one({
             '_id': username,
-            'password': generate_password_hash(password),
+            'password': password_hash,
             'role': role
         })
         
@@ -406,7 +526,7 @@ def profile():
         return redirect(url_for('login'))
         
     current_username = session['user']
-    user_data = users_collection.find_one({"_id": current_username}) or {}
+    user_data = get_users_collection().find_one({"_id": current_username}) or {}
     
     if request.method == 'POST':
         if 'avatar' not in request.files:
@@ -432,16 +552,16 @@ def profile():
         
         # Upload to Cloudinary
         file.seek(0)
-        upload_result = cloudinary.uploader.upload(
+        photo_url = upload_blob(
             file,
             folder="docuchain/photos",
             public_id=f"{photo_hash}"
         )
-        photo_url = upload_result.get('secure_url')
+        schedule_derivatives(file_data, photo_hash)
             
         user_data['avatar'] = photo_url
         user_data['last_photo_update'] = time.time()
-        users_collection.update_one({"_id": current_username}, {"$set": user_data})
+        get_users_collection().update_one({"_id": current_username}, {"$set": user_data})
         
         flash("Immutable Profile Photo updated successfully! Future verifications will anchor this photo.", "success")
         return redirect(url_for('profile'))
@@ -457,40 +577,32 @@ def dashboard():
     username = session.get('user')
     
     # Reload blockchain to be safe
-    blockchain.load_chain()
+    blockchain = get_loaded_blockchain()
     
     my_requests = []
     
     my_documents = []
     if role == 'Holder':
         # Find all documents issued to this student/holder
-        for block in blockchain.chain:
-            if block.student_name == username:
-                my_documents.append(block)
+        my_documents = blockchain.blocks_for_holder(username)
                 
         # Find all verification requests made by this holder
-        my_requests = list(requests_collection.find({"holder": username, "status": {"$ne": "Approved"}}))
+        my_requests = list(get_requests_collection().find({"holder": username, "status": {"$ne": "Approved"}}))
         for r in my_requests:
             r['id'] = r['_id']
                 
     elif role == 'Issuer':
         # Find all documents issued BY this organization
-        for block in blockchain.chain:
-            if block.issuer == username:
-                my_documents.append(block)
+        my_documents = blockchain.blocks_for_issuer(username)
                 
         # Find all pending verification requests targeted at this issuer
-        my_requests = list(requests_collection.find({"target_issuer": username, "status": "Pending"}))
+        my_requests = list(get_requests_collection().find({"target_issuer": username, "status": "Pending"}))
         for r in my_requests:
             r['id'] = r['_id']
                 
     return render_template('dashboard.html', role=role, username=username, my_documents=my_documents, my_requests=my_requests)
 
-@app.route('/document/<doc_hash>')
-def view_document(doc_hash):
-    blockchain.load_chain()
-    matching_block = blockchain.find_document_hash(doc_hash)
-    
+def render_document(matching_block):
     if not matching_block:
         flash("Document not found in the blockchain.", "danger")
         if 'user' in session:
@@ -501,48 +613,43 @@ def view_document(doc_hash):
     ist = timezone(timedelta(hours=5, minutes=30))
     formatted_date = datetime.fromtimestamp(matching_block.timestamp, ist).strftime('%B %d, %Y')
 
-    qr_base64 = None
-    # Generate QR Code containing metadata
-    qr_data = (f"DocuChain Verified\n"
-               f"Holder: {matching_block.student_name}\n"
-               f"ID: {matching_block.cert_id}\n"
-               f"Issuer: {matching_block.issuer}\n"
-               f"Issued: {formatted_date}\n"
-               f"Validity: {matching_block.validity}\n"
-               f"Hash: {matching_block.document_hash[:16]}...")
-    
-    qr = pyqrcode.create(qr_data)
-    buffer = io.BytesIO()
-    qr.svg(buffer, scale=4, background="white", module_color="#1E3A8A")
-    qr_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    qr_base64 = make_verification_qr(matching_block)
     
     return render_template('document.html', matching_block=matching_block, qr_base64=qr_base64, issued_date=formatted_date)
 
+@app.route('/document/<doc_hash>')
+def view_document(doc_hash):
+    # One indexed read instead of loading and scanning the whole chain
+    return render_document(get_blockchain().lookup('document_hash', doc_hash))
+
+@app.route('/c/<cert_id>')
+def resolve_cert(cert_id):
+    # Target of the QR codes: /c/<cert_id>?s=<hash prefix>.<signature>
+    matching_block = get_blockchain().lookup('cert_id', cert_id)
+    token = request.args.get('s')
+    if token:
+        prefix = check_qr_link(cert_id, token)
+        if prefix is None:
+            flash("This QR code's signature is not valid. Showing the on-chain record for this ID.", "warning")
+        elif matching_block and not matching_block.document_hash.startswith(prefix):
+            flash("The on-chain record for this ID does not match the document this QR code was issued for.", "danger")
+            return redirect(url_for('index'))
+    return render_document(matching_block)
+
 @app.route('/download_file/<doc_hash>')
 def download_file(doc_hash):
     if 'user' not in session:
         return redirect(url_for('login'))
         
-    # Query Cloudinary to find the file by its tag/hash
-    try:
-        # Search for document by public ID
-        resource = cloudinary.api.resource(f"docuchain/documents/doc_{doc_hash}")
-        url = resource.get('secure_url')
-        if url:
-            # We redirect them to the cloudinary URL but prompt a download
-            # Cloudinary provides an attachment flag: 'fl_attachment'
-            download_url = url.replace('/upload/', '/upload/fl_attachment/')
-            return redirect(download_url)
-    except cloudinary.exceptions.NotFound:
-        # Check if it was a verification request draft
-        try:
-            resource = cloudinary.api.resource(f"docuchain/requests/req_{doc_hash[:16]}")
-            url = resource.get('secure_url')
-            if url:
-                download_url = url.replace('/upload/', '/upload/fl_attachment/')
-                return redirect(download_url)
-        except cloudinary.exceptions.NotFound:
-            pass
+    # Find the file by its content-addressed public ID; fall back to a
+    # verification request draft
+    url = (find_resource_url(f"docuchain/documents/doc_{doc_hash}")
+           or find_resource_url(f"docuchain/requests/req_{doc_hash[:16]}"))
+    if url:
+        # We redirect them to the cloudinary URL but prompt a download
+        # Cloudinary provides an attachment flag: 'fl_attachment'
+        download_url = url.replace('/upload/', '/upload/fl_attachment/')
+        return redirect(download_url)
             
     flash("Original document file not found on the cloud server.", "warning")
     return redirect(url_for('dashboard'))
@@ -553,19 +660,10 @@ def view_file_route(doc_hash):
         return redirect(url_for('login'))
         
     # Redirect to the direct Cloudinary URL
-    try:
-        resource = cloudinary.api.resource(f"docuchain/documents/doc_{doc_hash}")
-        url = resource.get('secure_url')
-        if url:
-            return redirect(url)
-    except cloudinary.exceptions.NotFound:
-        try:
-            resource = cloudinary.api.resource(f"docuchain/requests/req_{doc_hash[:16]}")
-            url = resource.get('secure_url')
-            if url:
-                return redirect(url)
-        except cloudinary.exceptions.NotFound:
-            pass
+    url = (find_resource_url(f"docuchain/documents/doc_{doc_hash}")
+           or find_resource_url(f"docuchain/requests/req_{doc_hash[:16]}"))
+    if url:
+        return redirect(url)
             
     flash("Original document file not found on the cloud server.", "warning")
     return redirect(url_for('dashboard'))
@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import current_app, request
+
+# Static files are fingerprinted by content hash without a build step: the
+# manifest is computed from static/ the first time a worker builds a static
+# URL, url_for('static', filename='style.css') then yields
+# /static/style.<hash>.css, and that URL is served with a one-year immutable
+# Cache-Control. Editing a file changes its URL, so browsers never need to
+# revalidate. User uploads under static/uploads/ are left as they are.
+#
+# Compressible assets are served gzip-compressed (or brotli when the optional
+# `brotli` package is installed and the browser accepts it); each variant is
+# compressed once per worker and kept in memory. Large dynamic responses are
+# gzipped on the fly; the /chain page, which can run to tens of MB, instead
+# caches its compressed output per chain tip (see app.chain).
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+FINGERPRINT_LENGTH = 12
+EXCLUDED_DIRS = {"uploads"}
+COMPRESSIBLE_TYPES = {"text/css", "text/html", "text/plain", "text/javascript",
+                      "application/javascript", "application/json", "image/svg+xml"}
+# Below roughly one packet compression saves nothing worthwhile
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1400))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Asset:
+    def __init__(self, filename, path, digest):
+        self.filename = filename
+        self.path = path
+        self.digest = digest
+        self.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        self.compressible = self.mimetype in COMPRESSIBLE_TYPES
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprinted(self):
+        base, ext = os.path.splitext(self.filename)
+        return f"{base}.{self.digest}{ext}"
+
+    def variant(self, encoding):
+        """Body bytes for ``encoding`` ('identity', 'gzip' or 'br'), built once."""
+        with self._lock:
+            if encoding not in self._variants:
+                with open(self.path, 'rb') as f:
+                    data = f.read()
+                if encoding == 'gzip':
+                    data = gzip.compress(data, compresslevel=9, mtime=0)
+                elif encoding == 'br':
+                    data = brotli.compress(data, quality=11)
+                self._variants[encoding] = data
+            return self._variants[encoding]
+
+
+class AssetManifest:
+    """Content-hash manifest of the files under a static folder."""
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self._by_name = None
+        self._by_fingerprint = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        by_name, by_fingerprint = {}, {}
+        for root, dirs, files in os.walk(self.static_folder):
+            if root == self.static_folder:
+                dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+            for name in files:
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()[:FINGERPRINT_LENGTH]
+                asset = Asset(filename, path, digest)
+                by_name[filename] = asset
+                by_fingerprint[asset.fingerprinted] = asset
+        self._by_name, self._by_fingerprint = by_name, by_fingerprint
+
+    def _ensure_built(self):
+        if self._by_name is None:
+            with self._lock:
+                if self._by_name is None:
+                    self._build()
+
+    def url_filename(self, filename):
+        self._ensure_built()
+        asset = self._by_name.get(filename)
+        return asset.fingerprinted if asset else filename
+
+    def resolve(self, fingerprinted):
+        self._ensure_built()
+        return self._by_fingerprint.get(fingerprinted)
+
+    def refresh(self):
+        with self._lock:
+            self._by_name = self._by_fingerprint = None
+
+
+def _preferred_encoding(asset):
+    if not asset.compressible:
+        return 'identity'
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def accepts_gzip():
+    return bool(request.accept_encodings['gzip'])
+
+
+def gzip_bytes(data):
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+
+
+def gzip_response(compressed, mimetype='text/html'):
+    """Response for an already gzip-compressed body (skips compress_response)."""
+    response = current_app.response_class(compressed, mimetype=mimetype)
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app):
+    manifest = AssetManifest(app.static_folder)
+    app.extensions['asset_manifest'] = manifest
+    fallback_static = app.view_functions['static']
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        # Plain names while developing so edits show up without a restart
+        if endpoint == 'static' and 'filename' in values and not app.debug:
+            values['filename'] = manifest.url_filename(values['filename'])
+
+    def static(filename):
+        asset = manifest.resolve(filename)
+        if asset is None:
+            # Uploads, unfingerprinted names from old cached pages, debug mode
+            return fallback_static(filename=filename)
+
+        encoding = _preferred_encoding(asset)
+        response = current_app.response_class(asset.variant(encoding), mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if asset.compressible:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        response.set_etag(f"{asset.digest}-{encoding}")
+        return response.make_conditional(request)
+
+    app.view_functions['static'] = static
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        # Caches must key on Accept-Encoding whether or not this client gets gzip
+        response.vary.add('Accept-Encoding')
+        if request.accept_encodings['gzip']:
+            response.set_data(gzip.compress(data, compresslevel=COMPRESS_LEVEL))
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+    return manifest
@@ -0,0 +1,129 @@
+"""DocuChain benchmark suite.
+
+Runs fully offline: MongoDB and Cloudinary are replaced by the in-memory
+stand-ins from benchmarks/stubs.py.
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks run --quick
+    python -m benchmarks compare base.json head.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+DEFAULT_CHAIN_SIZES = "1000,10000,100000,1000000"
+DEFAULT_ROUTE_SIZES = "1000,10000"
+QUICK_SIZES = "1000,10000"
+
+
+def _sizes(value):
+    return [int(s) for s in value.split(',') if s.strip()]
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except Exception:
+        return None
+
+
+def _print_table(results, stream):
+    print(f"{'benchmark':<40} {'size':>9} {'median':>12} {'min':>12} {'ops/s':>14}", file=stream)
+    for r in results:
+        ops = f"{r['ops_per_s']:.1f}" if r['ops_per_s'] else '-'
+        print(f"{r['name']:<40} {r['size'] or '-':>9} {r['median_s'] * 1000:>10.3f}ms "
+              f"{r['min_s'] * 1000:>10.3f}ms {ops:>14}", file=stream)
+
+
+def run(args):
+    from benchmarks import stubs
+    database, storage = stubs.install()
+
+    from benchmarks import bench_chain, bench_routes
+    from app import app
+
+    chain_sizes = _sizes(QUICK_SIZES if args.quick else args.sizes)
+    route_sizes = _sizes(QUICK_SIZES if args.quick else args.route_sizes)
+
+    results = []
+    if args.only in (None, 'chain'):
+        results += bench_chain.run(database['blockchain'], chain_sizes, repeat=args.repeat)
+    if args.only in (None, 'routes'):
+        results += bench_routes.run(app, database, route_sizes, repeat=args.repeat)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.time(),
+            "chain_sizes": chain_sizes,
+            "route_sizes": route_sizes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    _print_table(results, sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    with open(args.head) as f:
+        head = json.load(f)['results']
+
+    regressions = 0
+    print(f"{'benchmark':<40} {'size':>9} {'base':>12} {'head':>12} {'change':>9}")
+    for r in head:
+        old = base.get((r['name'], r['size']))
+        if not old:
+            continue
+        change = r['median_s'] / old['median_s'] - 1 if old['median_s'] else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  <-- regression'
+            regressions += 1
+        print(f"{r['name']:<40} {r['size'] or '-':>9} {old['median_s'] * 1000:>10.3f}ms "
+              f"{r['median_s'] * 1000:>10.3f}ms {change:>+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="DocuChain benchmark suite")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('--sizes', default=DEFAULT_CHAIN_SIZES, help="comma separated chain sizes for blockchain.py")
+    run_parser.add_argument('--route-sizes', default=DEFAULT_ROUTE_SIZES, help="comma separated chain sizes for route benchmarks")
+    run_parser.add_argument('--quick', action='store_true', help=f"use {QUICK_SIZES} for both groups")
+    run_parser.add_argument('--only', choices=['chain', 'routes'], help="run a single group")
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+
+    compare_parser = sub.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="relative slowdown reported as a regression (default 0.10)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        return run(args)
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from blockchain import Block, Blockchain
+from benchmarks.timing import measure
+from demo_files.generate_demo_files import iter_synthetic_blocks, synthetic_document
+
+SEED = 2026
+GENESIS_TIMESTAMP = 1700000000.0
+
+
+def benchmark_document(i):
+    # File content whose SHA-256 is anchored at block i of a benchmark chain
+    return synthetic_document(SEED, i)
+
+
+def build_chain_docs(size):
+    """Return ``size`` linked block dicts (genesis included), as stored in Mongo."""
+    genesis = Block(0, GENESIS_TIMESTAMP, "Genesis", "System", "0", "0")
+    docs = [genesis.to_dict()]
+    docs.extend(b.to_dict() for b in iter_synthetic_blocks(
+        genesis, size - 1, seed=SEED, start_time=GENESIS_TIMESTAMP, span_seconds=3 * 365 * 86400))
+    return docs
+
+
+def seed_chain(collection, size):
+    collection.delete_many({})
+    collection.insert_many(build_chain_docs(size))
+
+
+def run(collection, sizes, repeat=5, hash_iterations=10000):
+    results = []
+
+    block = Block.from_dict(build_chain_docs(2)[1])
+    results.append(measure(
+        "block.calculate_block_hash",
+        lambda: [block.calculate_block_hash() for _ in range(hash_iterations)],
+        repeat=repeat, ops=hash_iterations,
+    ))
+
+    for size in sizes:
+        seed_chain(collection, size)
+        bc = Blockchain()
+
+        results.append(measure("blockchain.load_chain", bc.load_chain, repeat=repeat, size=size, ops=size))
+        assert len(bc.chain) == size
+
+        results.append(measure("blockchain.verify_chain", bc.verify_chain, repeat=repeat, size=size, ops=size))
+
+        # Worst case for the linear scan is the block at the tip, plus a miss
+        tip_hash = bc.chain[-1].document_hash
+        results.append(measure("blockchain.find_document_hash[tip]",
+                               lambda: bc.find_document_hash(tip_hash),
+                               repeat=repeat, size=size))
+        results.append(measure("blockchain.find_document_hash[miss]",
+                               lambda: bc.find_document_hash("f" * 64),
+                               repeat=repeat, size=size))
+
+        bc.chain = []
+    collection.delete_many({})
+    return results
@@ -0,0 +1,74 @@
+import io
+import itertools
+
+from benchmarks.bench_chain import benchmark_document, seed_chain
+from benchmarks.timing import measure
+
+
+def _client(app, user=None, role=None):
+    client = app.test_client()
+    if user:
+        with client.session_transaction() as sess:
+            sess['user'] = user
+            sess['role'] = role
+    return client
+
+
+def _check(response, name):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{name} returned HTTP {response.status_code}")
+    return response
+
+
+def run(app, database, sizes, repeat=5):
+    results = []
+    users = database['users']
+    anonymous = _client(app)
+    uploads = itertools.count()
+
+    for size in sizes:
+        seed_chain(database['blockchain'], size)
+        tip_document = benchmark_document(size - 1)
+
+        # Log in as the issuer and holder of the tip block so dashboards have data
+        tip = database['blockchain'].find_one({"index": size - 1})
+        issuer, holder = tip['issuer'], tip['student_name']
+        users.delete_many({})
+        users.insert_one({"_id": issuer, "password": "", "role": "Issuer"})
+        users.insert_one({"_id": holder, "password": "", "role": "Holder"})
+        issuer_client = _client(app, issuer, 'Issuer')
+        holder_client = _client(app, holder, 'Holder')
+
+        def verify_hit():
+            data = {'document': (io.BytesIO(tip_document), 'document.pdf')}
+            _check(anonymous.post('/verify', data=data, content_type='multipart/form-data'), '/verify')
+
+        def verify_miss():
+            data = {'document': (io.BytesIO(b"not on the chain"), 'document.pdf')}
+            _check(anonymous.post('/verify', data=data, content_type='multipart/form-data'), '/verify')
+
+        def issue():
+            n = next(uploads)
+            data = {
+                'document': (io.BytesIO(f"issued-document-{n}".encode()), 'document.pdf'),
+                'holder_photo': (io.BytesIO(b"\xff\xd8\xff benchmark photo"), 'photo.jpg'),
+                'document_type': 'Academic Certificate',
+                'student_name': holder,
+                'validity': 'Lifetime',
+            }
+            _check(issuer_client.post('/issue', data=data, content_type='multipart/form-data'), '/issue')
+
+        routes = [
+            ("GET /chain[anonymous]", lambda: _check(anonymous.get('/chain'), '/chain')),
+            ("GET /chain[logged_in]", lambda: _check(holder_client.get('/chain'), '/chain')),
+            ("POST /verify[hit]", verify_hit),
+            ("POST /verify[miss]", verify_miss),
+            ("GET /dashboard[issuer]", lambda: _check(issuer_client.get('/dashboard'), '/dashboard')),
+            ("GET /dashboard[holder]", lambda: _check(holder_client.get('/dashboard'), '/dashboard')),
+            ("POST /issue", issue),
+        ]
+        for name, func in routes:
+            results.append(measure(name, func, repeat=repeat, size=size))
+
+    database['blockchain'].delete_many({})
+    return results
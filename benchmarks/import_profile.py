@@ -0,0 +1,94 @@
+"""Import-time and boot-readiness profile for app.py.
+
+Each run starts a fresh interpreter with ``-X importtime`` that imports the
+app and answers one /health request through the test client, the same work a
+gunicorn worker does before it can pass a health check.
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --runs 10 --top 30 --output boot.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_PROBE = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/health')
+ready = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(f"{imported - start} {ready - start}")
+"""
+
+
+def _run_once():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', _PROBE], cwd=root,
+                          capture_output=True, text=True, check=True)
+    import_s, ready_s = (float(x) for x in proc.stdout.split())
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us), len(name) - len(name.lstrip()))
+    return import_s, ready_s, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_profile", description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=20, help="number of modules to list")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    import_times, ready_times = [], []
+    per_module = {}
+    for _ in range(args.runs):
+        import_s, ready_s, modules = _run_once()
+        import_times.append(import_s)
+        ready_times.append(ready_s)
+        for name, (self_us, cumulative_us, depth) in modules.items():
+            per_module.setdefault(name, []).append((self_us, cumulative_us, depth))
+
+    rows = []
+    for name, samples in per_module.items():
+        rows.append({
+            "module": name,
+            "self_ms": statistics.median(s[0] for s in samples) / 1000,
+            "cumulative_ms": statistics.median(s[1] for s in samples) / 1000,
+            # Direct imports of the probe are listed one level in
+            "top_level": samples[0][2] == 1,
+        })
+    rows.sort(key=lambda r: r['cumulative_ms'], reverse=True)
+
+    report = {
+        "runs": args.runs,
+        "import_app_ms": statistics.median(import_times) * 1000,
+        "health_ready_ms": statistics.median(ready_times) * 1000,
+        "modules_imported": len(per_module),
+        "top_level": [r for r in rows if r['top_level']],
+        "slowest": rows[:args.top],
+    }
+
+    print(f"import app:        {report['import_app_ms']:.1f} ms (median of {args.runs})", file=sys.stderr)
+    print(f"first /health 200: {report['health_ready_ms']:.1f} ms", file=sys.stderr)
+    print(f"modules imported:  {report['modules_imported']}\n", file=sys.stderr)
+    print(f"{'module':<50} {'cumulative':>12} {'self':>10}", file=sys.stderr)
+    for r in report['slowest']:
+        print(f"{r['module']:<50} {r['cumulative_ms']:>10.1f}ms {r['self_ms']:>8.1f}ms", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
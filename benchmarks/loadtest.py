@@ -0,0 +1,407 @@
+"""Load-test harness for a gunicorn gthread deployment of DocuChain.
+
+Boots ``benchmarks.stub_app:app`` under gunicorn with the same worker class
+as the Procfile, drives open-loop mixed traffic at a fixed rate and reports
+throughput, latency percentiles per route and worker CPU/memory.
+
+    python -m benchmarks.loadtest --rate 50 --duration 60
+    python -m benchmarks.loadtest --rate 200 --mix verify=60,chain=20,dashboard=20 --output load.json
+    python -m benchmarks.loadtest --url http://staging:8000 --rate 20   # existing server, no boot
+
+Latency is measured from the moment a request was *scheduled*, not when a
+client thread picked it up, so a saturated server shows up as rising latency
+instead of silently lowering the offered rate.
+"""
+import argparse
+import hashlib
+import http.cookiejar
+import itertools
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_chain import benchmark_document
+
+# Accounts seeded by benchmarks/stub_app.py
+LOADTEST_PASSWORD = "loadtest-password"
+LOADTEST_ISSUER = "Load Test University"
+LOADTEST_HOLDERS = [f"loadtest-holder-{i}" for i in range(4)]
+
+DEFAULT_MIX = "verify=40,chain=20,dashboard=20,issue=10,approve=10"
+
+
+# ---------------------------------------------------------------------------
+# HTTP client
+# ---------------------------------------------------------------------------
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Time the POST itself; following the redirect would add a second request
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Session:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method, path, fields=None, files=None, timeout=60):
+        headers = {}
+        body = None
+        if files:
+            boundary = uuid.uuid4().hex
+            parts = []
+            for name, value in (fields or {}).items():
+                parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+            for name, (filename, data) in files.items():
+                parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                             f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b'\r\n')
+            parts.append(f'--{boundary}--\r\n'.encode())
+            body = b''.join(parts)
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        elif fields is not None:
+            body = urllib.parse.urlencode(fields).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        req = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            # 3xx lands here because redirects are not followed
+            e.read()
+            return e.code
+
+    def login(self, username, password):
+        status = self.request('POST', '/login', fields={'username': username, 'password': password})
+        if status != 302:
+            raise RuntimeError(f"login as {username!r} failed with HTTP {status}")
+
+
+# ---------------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------------
+
+def _timed(route, func, *args, **kwargs):
+    start = time.monotonic()
+    status = func(*args, **kwargs)
+    return route, status, time.monotonic() - start
+
+
+class Traffic:
+    """The mixed workload. Each scenario returns [(route, status, seconds), ...]."""
+
+    def __init__(self, base_url, blocks):
+        self.base_url = base_url
+        self.blocks = blocks
+        self.counter = itertools.count()
+        self.run_id = uuid.uuid4().hex[:8]
+        self.anonymous = Session(base_url)
+        self.issuer = Session(base_url)
+        self.issuer.login(LOADTEST_ISSUER, LOADTEST_PASSWORD)
+        self.holders = []
+        for holder in LOADTEST_HOLDERS:
+            session = Session(base_url)
+            session.login(holder, LOADTEST_PASSWORD)
+            self.holders.append(session)
+
+    def _unique_document(self):
+        return f"loadtest-{self.run_id}-{next(self.counter)}".encode()
+
+    def verify(self):
+        index = random.randrange(1, self.blocks)
+        return [_timed('POST /verify', self.anonymous.request, 'POST', '/verify',
+                       files={'document': ('document.pdf', benchmark_document(index))})]
+
+    def chain(self):
+        return [_timed('GET /chain', self.anonymous.request, 'GET', '/chain')]
+
+    def dashboard(self):
+        if random.random() < 0.5:
+            return [_timed('GET /dashboard[issuer]', self.issuer.request, 'GET', '/dashboard')]
+        return [_timed('GET /dashboard[holder]', random.choice(self.holders).request, 'GET', '/dashboard')]
+
+    def issue(self):
+        return [_timed('POST /issue', self.issuer.request, 'POST', '/issue', fields={
+            'document_type': 'Academic Certificate',
+            'student_name': random.choice(LOADTEST_HOLDERS),
+            'validity': 'Lifetime',
+        }, files={
+            'document': ('document.pdf', self._unique_document()),
+            'holder_photo': ('photo.jpg', b'\xff\xd8\xff loadtest photo'),
+        })]
+
+    def login(self):
+        # A fresh session logging in, i.e. one password hash check on the server
+        session = Session(self.base_url)
+        return [_timed('POST /login', session.request, 'POST', '/login',
+                       fields={'username': random.choice(LOADTEST_HOLDERS), 'password': LOADTEST_PASSWORD})]
+
+    def approve(self):
+        # A holder files a request, then the issuer approves it
+        document = self._unique_document()
+        holder = random.choice(self.holders)
+        results = [_timed('POST /request_verification', holder.request, 'POST', '/request_verification',
+                          fields={'document_type': 'Academic Certificate', 'target_issuer': LOADTEST_ISSUER},
+                          files={'document': ('document.pdf', document)})]
+        if results[0][1] < 400:
+            req_id = f"REQ-{hashlib.sha256(document).hexdigest()[:8].upper()}"
+            results.append(_timed('POST /approve_request', self.issuer.request,
+                                  'POST', f'/approve_request/{req_id}', fields={}))
+        return results
+
+
+# ---------------------------------------------------------------------------
+# Worker resource sampling (Linux /proc)
+# ---------------------------------------------------------------------------
+
+def _children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+                if int(fields[1]) == pid:
+                    children.append(int(entry))
+            except (OSError, IndexError):
+                continue
+    return children
+
+
+def _cpu_seconds(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def _rss_bytes(pid):
+    with open(f'/proc/{pid}/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class ResourceSampler(threading.Thread):
+    def __init__(self, master_pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples = defaultdict(list)
+        self._stopped = threading.Event()
+
+    def run(self):
+        last = {}
+        while not self._stopped.wait(self.interval):
+            now = time.monotonic()
+            for pid in _children(self.master_pid):
+                try:
+                    cpu = _cpu_seconds(pid)
+                    rss = _rss_bytes(pid)
+                except OSError:
+                    continue
+                if pid in last:
+                    prev_time, prev_cpu = last[pid]
+                    self.samples[pid].append((100.0 * (cpu - prev_cpu) / (now - prev_time), rss))
+                last[pid] = (now, cpu)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def report(self):
+        workers = {}
+        for pid, samples in self.samples.items():
+            cpu = [s[0] for s in samples]
+            rss = [s[1] for s in samples]
+            workers[str(pid)] = {
+                "cpu_percent_mean": sum(cpu) / len(cpu),
+                "cpu_percent_max": max(cpu),
+                "rss_mb_max": max(rss) / 2 ** 20,
+                "rss_mb_last": rss[-1] / 2 ** 20,
+            }
+        return workers
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def boot_server(args):
+    port = _free_port()
+    env = dict(os.environ, DOCUCHAIN_LOADTEST_BLOCKS=str(args.blocks))
+    if args.mongo_uri:
+        env['DOCUCHAIN_LOADTEST_MONGO_URI'] = args.mongo_uri
+    cmd = [sys.executable, '-m', 'gunicorn', 'benchmarks.stub_app:app',
+           '--bind', f'127.0.0.1:{port}', '--preload', '--timeout', '120',
+           '--worker-class', 'gthread', '--threads', str(args.threads), '--workers', str(args.workers),
+           '--log-level', 'warning']
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(cmd, cwd=root, env=env)
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + args.boot_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {proc.returncode}")
+        try:
+            if Session(base_url).request('GET', '/health', timeout=2) == 200:
+                return proc, base_url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not become healthy in time")
+
+
+def _parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {'verify', 'chain', 'dashboard', 'issue', 'approve', 'login'}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+def drive(traffic, mix, rate, duration, concurrency):
+    scenarios = list(mix)
+    weights = [mix[s] for s in scenarios]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def fire(scenario, scheduled):
+        # Time spent waiting for a free client thread is charged to the
+        # scenario's first request
+        queued = time.monotonic() - scheduled
+        try:
+            outcomes = getattr(traffic, scenario)()
+        except Exception:
+            outcomes = [(scenario, 599, time.monotonic() - scheduled - queued)]
+        with lock:
+            for i, (route, status, elapsed) in enumerate(outcomes):
+                latencies[route].append(elapsed + (queued if i == 0 else 0.0))
+                if status >= 400:
+                    errors[route] += 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for n in itertools.count():
+            scheduled = started + n / rate
+            if scheduled - started >= duration:
+                break
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, random.choices(scenarios, weights)[0], scheduled)
+    wall = time.monotonic() - started
+
+    routes = {}
+    for route, values in sorted(latencies.items()):
+        values.sort()
+        routes[route] = {
+            "requests": len(values),
+            "errors": errors[route],
+            "throughput_rps": len(values) / wall,
+            "p50_ms": _percentile(values, 50) * 1000,
+            "p90_ms": _percentile(values, 90) * 1000,
+            "p99_ms": _percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+    total = sum(len(v) for v in latencies.values())
+    return {"wall_s": wall, "requests": total, "throughput_rps": total / wall, "routes": routes}
+
+
+def _print_report(report, stream):
+    print(f"\n{report['requests']} requests in {report['wall_s']:.1f}s "
+          f"({report['throughput_rps']:.1f} req/s, offered {report['config']['rate']:.1f} scenarios/s)", file=stream)
+    print(f"{'route':<30} {'reqs':>7} {'errs':>6} {'rps':>8} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}", file=stream)
+    for route, r in report['routes'].items():
+        print(f"{route:<30} {r['requests']:>7} {r['errors']:>6} {r['throughput_rps']:>8.1f} "
+              f"{r['p50_ms']:>8.1f}ms {r['p90_ms']:>8.1f}ms {r['p99_ms']:>8.1f}ms {r['max_ms']:>8.1f}ms", file=stream)
+    for pid, w in report.get('workers', {}).items():
+        print(f"worker {pid}: cpu mean {w['cpu_percent_mean']:.0f}% max {w['cpu_percent_max']:.0f}%, "
+              f"rss max {w['rss_mb_max']:.0f} MB", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.split('\n')[0])
+    parser.add_argument('--rate', type=float, default=20, help="offered load in scenarios per second")
+    parser.add_argument('--duration', type=float, default=30, help="seconds of load")
+    parser.add_argument('--mix', type=_parse_mix, default=_parse_mix(DEFAULT_MIX),
+                        help=f"scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument('--concurrency', type=int, default=256, help="max in-flight client requests")
+    parser.add_argument('--blocks', type=int, default=1000, help="chain size seeded into the stand-in database")
+    parser.add_argument('--workers', type=int, default=1, help="gunicorn workers (the Procfile uses the default of 1)")
+    parser.add_argument('--threads', type=int, default=4, help="gthread threads per worker")
+    parser.add_argument('--mongo-uri', help="use a real MongoDB (needed for --workers > 1 to share state)")
+    parser.add_argument('--url', help="target an already running server instead of booting one")
+    parser.add_argument('--boot-timeout', type=float, default=120)
+    parser.add_argument('--output', help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and not args.mongo_uri and not args.url:
+        print("warning: in-memory stand-ins are per worker; issued blocks will not be shared", file=sys.stderr)
+
+    proc = sampler = None
+    if args.url:
+        base_url = args.url
+    else:
+        proc, base_url = boot_server(args)
+        if os.path.isdir('/proc'):
+            sampler = ResourceSampler(proc.pid)
+            sampler.start()
+
+    try:
+        traffic = Traffic(base_url, args.blocks)
+        report = drive(traffic, args.mix, args.rate, args.duration, args.concurrency)
+    finally:
+        if sampler:
+            sampler.stop()
+        if proc:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+
+    report['config'] = {
+        "rate": args.rate, "duration": args.duration, "mix": args.mix, "blocks": args.blocks,
+        "workers": args.workers, "threads": args.threads, "url": args.url,
+    }
+    if sampler:
+        report['workers'] = sampler.report()
+
+    _print_report(report, sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""WSGI entry point that serves DocuChain against local stand-ins.
+
+Used by the load-test harness:
+
+    gunicorn benchmarks.stub_app:app --preload --worker-class gthread --threads 4
+    gunicorn benchmarks.stub_app:verify_app --preload --worker-class asgi   # async verification API
+
+Configuration comes from the environment:
+
+    DOCUCHAIN_LOADTEST_BLOCKS      chain size to seed (default 1000)
+    DOCUCHAIN_LOADTEST_STORAGE     directory for uploaded files (default: temp dir)
+    DOCUCHAIN_LOADTEST_MONGO_URI   use this real MongoDB instead of the in-memory
+                                   stand-in (required to share state across
+                                   more than one gunicorn worker)
+"""
+import os
+
+from werkzeug.security import generate_password_hash
+
+_mongo_uri = os.environ.get('DOCUCHAIN_LOADTEST_MONGO_URI')
+if _mongo_uri:
+    os.environ['MONGO_URI'] = _mongo_uri
+
+from benchmarks import stubs  # noqa: E402
+
+database, storage = stubs.install(os.environ.get('DOCUCHAIN_LOADTEST_STORAGE'), mongo=not _mongo_uri)
+
+from benchmarks.bench_chain import seed_chain  # noqa: E402
+from benchmarks.loadtest import LOADTEST_HOLDERS, LOADTEST_ISSUER, LOADTEST_PASSWORD  # noqa: E402
+from app import app  # noqa: E402
+from verify_service import app as verify_app  # noqa: E402,F401
+
+seed_chain(database['blockchain'], int(os.environ.get('DOCUCHAIN_LOADTEST_BLOCKS', 1000)))
+
+# Hash once and share it; scrypt is deliberately slow
+_password_hash = generate_password_hash(LOADTEST_PASSWORD)
+database['users'].delete_many({"_id": {"$in": [LOADTEST_ISSUER] + LOADTEST_HOLDERS}})
+database['users'].insert_one({"_id": LOADTEST_ISSUER, "password": _password_hash, "role": "Issuer"})
+for holder in LOADTEST_HOLDERS:
+    database['users'].insert_one({"_id": holder, "password": _password_hash, "role": "Holder"})
+database['requests'].delete_many({"target_issuer": LOADTEST_ISSUER})
@@ -0,0 +1,323 @@
+import copy
+import itertools
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import cloudinary
+import cloudinary.api
+import cloudinary.exceptions
+import cloudinary.uploader
+from pymongo.errors import DuplicateKeyError
+
+
+# ---------------------------------------------------------------------------
+# MongoDB stand-in
+#
+# Only the small subset of the pymongo API that DocuChain actually uses is
+# implemented here. It is good enough to run the app and the benchmarks
+# offline, it is NOT a general purpose Mongo emulator.
+# ---------------------------------------------------------------------------
+
+def _matches(doc, query):
+    for key, expected in (query or {}).items():
+        value = doc.get(key)
+        if isinstance(expected, dict) and any(k.startswith('$') for k in expected):
+            for op, operand in expected.items():
+                if op == '$ne' and value == operand:
+                    return False
+                if op == '$in' and value not in operand:
+                    return False
+                if op == '$nin' and value in operand:
+                    return False
+                if op == '$gt' and not (value is not None and value > operand):
+                    return False
+                if op == '$gte' and not (value is not None and value >= operand):
+                    return False
+                if op == '$lt' and not (value is not None and value < operand):
+                    return False
+                if op == '$lte' and not (value is not None and value <= operand):
+                    return False
+        elif value != expected:
+            return False
+    return True
+
+
+class InMemoryCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key_or_list, direction=1):
+        keys = key_or_list if isinstance(key_or_list, list) else [(key_or_list, direction)]
+        # Apply the least significant key first so the sort is stable overall
+        for key, dirn in reversed(keys):
+            self._docs.sort(key=lambda d: d.get(key), reverse=dirn == -1)
+        return self
+
+    def skip(self, count):
+        self._docs = self._docs[count:]
+        return self
+
+    def limit(self, count):
+        if count:
+            self._docs = self._docs[:count]
+        return self
+
+    def __iter__(self):
+        for doc in self._docs:
+            yield copy.copy(doc)
+
+
+class InMemoryCollection:
+    def __init__(self, name, database=None):
+        self.name = name
+        self._database = database
+        self._docs = {}
+        self._ids = itertools.count(1)
+        # Field tuples of unique indexes; enforced on insert like the real thing
+        self._unique = []
+        # gunicorn gthread workers hit the same collection from several threads
+        self._lock = threading.RLock()
+
+    def insert_one(self, doc):
+        with self._lock:
+            if '_id' not in doc:
+                doc['_id'] = f"{self.name}-{next(self._ids)}"
+            if doc['_id'] in self._docs:
+                raise DuplicateKeyError(f"duplicate key {doc['_id']!r} in {self.name}")
+            for fields in self._unique:
+                key = tuple(doc.get(f) for f in fields)
+                if any(tuple(d.get(f) for f in fields) == key for d in self._docs.values()):
+                    raise DuplicateKeyError(f"duplicate key {dict(zip(fields, key))!r} in {self.name}")
+            self._docs[doc['_id']] = copy.copy(doc)
+        return SimpleNamespace(inserted_id=doc['_id'], acknowledged=True)
+
+    def insert_many(self, docs, ordered=True):
+        with self._lock:
+            ids = [self.insert_one(doc).inserted_id for doc in docs]
+        return SimpleNamespace(inserted_ids=ids, acknowledged=True)
+
+    def find(self, query=None, projection=None):
+        with self._lock:
+            return InMemoryCursor([d for d in self._docs.values() if _matches(d, query)])
+
+    def find_one(self, query=None, projection=None):
+        with self._lock:
+            if query and isinstance(query.get('_id'), str):
+                doc = self._docs.get(query['_id'])
+                return copy.copy(doc) if doc is not None and _matches(doc, query) else None
+            for doc in self._docs.values():
+                if _matches(doc, query):
+                    return copy.copy(doc)
+        return None
+
+    def update_one(self, query, update, upsert=False):
+        with self._lock:
+            for doc in self._docs.values():
+                if _matches(doc, query):
+                    doc.update(update.get('$set', {}))
+                    return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+            if upsert:
+                new_doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+                new_doc.update(update.get('$setOnInsert', {}))
+                new_doc.update(update.get('$set', {}))
+                inserted_id = self.insert_one(new_doc).inserted_id
+                return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=inserted_id)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    def delete_many(self, query):
+        with self._lock:
+            doomed = [k for k, d in self._docs.items() if _matches(d, query)]
+            for key in doomed:
+                del self._docs[key]
+        return SimpleNamespace(deleted_count=len(doomed))
+
+    def count_documents(self, query):
+        with self._lock:
+            return sum(1 for d in self._docs.values() if _matches(d, query))
+
+    def distinct(self, key, query=None):
+        with self._lock:
+            values = []
+            for d in self._docs.values():
+                if _matches(d, query or {}) and key in d and d[key] not in values:
+                    values.append(d[key])
+            return values
+
+    def drop(self):
+        with self._lock:
+            self._docs.clear()
+            self._unique = []
+        if self._database is not None:
+            self._database._collections.pop(self.name, None)
+
+    def rename(self, new_name, dropTarget=False):
+        collections = self._database._collections
+        target = collections.get(new_name)
+        if target is not None and target is not self:
+            if target._docs and not dropTarget:
+                raise ValueError(f"target namespace {new_name!r} exists")
+            target.drop()
+        collections.pop(self.name, None)
+        self.name = new_name
+        collections[new_name] = self
+
+    def create_index(self, keys, **kwargs):
+        if kwargs.get('unique'):
+            fields = tuple(k for k, _ in keys) if isinstance(keys, list) else (keys,)
+            with self._lock:
+                if fields not in self._unique:
+                    self._unique.append(fields)
+        return kwargs.get('name', str(keys))
+
+
+class InMemoryDatabase:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = InMemoryCollection(name, self)
+        return self._collections[name]
+
+    def list_collection_names(self):
+        return [name for name, c in self._collections.items() if c._docs]
+
+
+class InMemoryMongoClient:
+    def __init__(self):
+        self._databases = {}
+
+    def __getitem__(self, name):
+        if name not in self._databases:
+            self._databases[name] = InMemoryDatabase()
+        return self._databases[name]
+
+    def close(self):
+        pass
+
+
+class AsyncInMemoryCursor:
+    """Async view of an InMemoryCursor, shaped like pymongo's AsyncCursor."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, key_or_list, direction=1):
+        self._cursor.sort(key_or_list, direction)
+        return self
+
+    def limit(self, count):
+        self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        docs = list(self._cursor)
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._cursor:
+            yield doc
+
+
+class AsyncInMemoryCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, query=None, projection=None):
+        return AsyncInMemoryCursor(self._collection.find(query, projection))
+
+    async def find_one(self, query=None, projection=None):
+        return self._collection.find_one(query, projection)
+
+
+class AsyncInMemoryDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return AsyncInMemoryCollection(self._database[name])
+
+
+class AsyncInMemoryMongoClient:
+    """AsyncMongoClient stand-in sharing data with an InMemoryMongoClient."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getitem__(self, name):
+        return AsyncInMemoryDatabase(self._client[name])
+
+    async def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Cloudinary stand-in
+#
+# Uploads are written to a local directory and handed back as file:// URLs,
+# which urllib can open, so routes like /approve_request keep working.
+# ---------------------------------------------------------------------------
+
+class LocalStorage:
+    def __init__(self, root=None):
+        self.root = root or tempfile.mkdtemp(prefix="docuchain-storage-")
+        self.uploads = 0
+        self.bytes_uploaded = 0
+
+    def _path(self, public_id):
+        return os.path.join(self.root, *public_id.split('/'))
+
+    def upload(self, file, **options):
+        if hasattr(file, 'read'):
+            data = file.read()
+        elif isinstance(file, (bytes, bytearray)):
+            data = bytes(file)
+        else:
+            with open(file, 'rb') as f:
+                data = f.read()
+
+        public_id = options.get('public_id') or f"blob_{self.uploads}"
+        if options.get('folder'):
+            public_id = f"{options['folder']}/{public_id}"
+
+        path = self._path(public_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        self.uploads += 1
+        self.bytes_uploaded += len(data)
+        return {"public_id": public_id, "secure_url": f"file://{path}", "bytes": len(data)}
+
+    def resource(self, public_id, **options):
+        path = self._path(public_id)
+        if not os.path.exists(path):
+            raise cloudinary.exceptions.NotFound(f"Resource not found - {public_id}")
+        return {"public_id": public_id, "secure_url": f"file://{path}"}
+
+
+def install(storage_root=None, mongo=True):
+    """Point db.py and cloudinary at in-memory/local stand-ins.
+
+    Must be called before the app handles any request. With ``mongo=False``
+    only storage is replaced and the real MONGO_URI database is used. Returns
+    the database and the local storage so callers can seed or inspect them.
+    """
+    import db
+
+    if mongo:
+        # db.get_client() creates the real client lazily; pre-empt it
+        db._client = InMemoryMongoClient()
+        db._async_client = AsyncInMemoryMongoClient(db._client)
+    database = db.get_db()
+
+    storage = LocalStorage(storage_root)
+    cloudinary.uploader.upload = storage.upload
+    cloudinary.api.resource = storage.resource
+
+    return database, storage
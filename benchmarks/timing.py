@@ -0,0 +1,39 @@
+import gc
+import statistics
+import time
+
+
+def measure(name, func, repeat=5, warmup=1, size=None, ops=1):
+    """Time ``func`` and return a result record.
+
+    ``ops`` is the number of logical operations one call performs, so that
+    per-operation throughput can be compared across chain sizes.
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    median = statistics.median(samples)
+    return {
+        "name": name,
+        "size": size,
+        "repeat": repeat,
+        "ops": ops,
+        "min_s": min(samples),
+        "median_s": median,
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_s": ops / median if median else None,
+    }
@@ -1,8 +1,16 @@
 import hashlib
 import json
+import os
+import threading
 import time
 
-from db import blockchain_collection
+from db import get_blockchain_collection, get_issuer_chains_collection
+
+# Blocks that don't record an issued document
+ANCHOR_DOCUMENT_TYPE = "Sub-chain Anchor"
+NON_DOCUMENT_TYPES = ["Genesis", ANCHOR_DOCUMENT_TYPE]
+# Fields that can be looked up with one indexed read (see Blockchain.lookup)
+LOOKUP_FIELDS = ("cert_id", "document_hash")
 
 class Block:
     def __init__(self, index, timestamp, document_type, issuer, document_hash, previous_hash, 
@@ -72,7 +80,7 @@ class Blockchain:
 
     def load_chain(self):
         try:
-            docs = list(blockchain_collection.find().sort([("index", 1)]))
+            docs = list(get_blockchain_collection().find().sort([("index", 1)]))
             if docs:
                 self.chain = [Block.from_dict(b) for b in docs]
             else:
@@ -90,11 +98,21 @@ class Blockchain:
     def create_genesis_block(self):
         genesis_block = Block(0, time.time(), "Genesis", "System", "0", "0")
         self.chain.append(genesis_block)
-        blockchain_collection.insert_one(genesis_block.to_dict())
+        get_blockchain_collection().insert_one(genesis_block.to_dict())
 
     def get_latest_block(self):
         return self.chain[-1]
 
+    def load_head(self):
+        # Appending only needs the tip, not the whole chain
+        docs = list(get_blockchain_collection().find().sort([("index", -1)]).limit(1))
+        if docs:
+            self.chain = [Block.from_dict(docs[0])]
+        else:
+            self.chain = []
+            self.create_genesis_block()
+        return self.chain[-1]
+
     def add_block(self, document_type, issuer, document_hash, 
                   student_name=None, cert_id=None, validity=None, student_image=None):
         previous_block = self.get_latest_block()
@@ -111,26 +129,307 @@ class Blockchain:
             student_image=student_image
         )
         self.chain.append(new_block)
-        blockchain_collection.insert_one(new_block.to_dict())
+        get_blockchain_collection().insert_one(new_block.to_dict())
         return new_block
 
     def verify_chain(self):
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
-
-            # Re-calculate hash to ensure block data wasn't changed
-            if current_block.block_hash != current_block.calculate_block_hash():
-                return False
-            
-            # Check if previous hash matches
-            if current_block.previous_hash != previous_block.block_hash:
-                return False
-                
-        return True
+        return verify_blocks(self.chain)
 
     def find_document_hash(self, document_hash):
         for block in self.chain:
             if block.document_hash == document_hash:
                 return block
         return None
+
+    def blocks_for_issuer(self, issuer):
+        return [block for block in self.chain if block.issuer == issuer]
+
+    def _ensure_lookup_indexes(self):
+        if getattr(self, '_lookup_indexes_created', False):
+            return
+        for field in LOOKUP_FIELDS:
+            get_blockchain_collection().create_index(field)
+        self._lookup_indexes_created = True
+
+    def lookup(self, field, value):
+        """Earliest document block with ``field == value``, read straight from
+        the database instead of loading and scanning the whole chain. Like
+        find_document_hash, the first anchored record wins, so re-issuing the
+        same document later can't take over its verification."""
+        if field not in LOOKUP_FIELDS:
+            raise ValueError(f"{field} is not an indexed lookup field")
+        self._ensure_lookup_indexes()
+        docs = list(get_blockchain_collection().find(
+            {field: value, "document_type": {"$nin": NON_DOCUMENT_TYPES}}).sort([("index", 1)]).limit(1))
+        return Block.from_dict(docs[0]) if docs else None
+
+    def blocks_for_holder(self, holder):
+        return [block for block in self.chain if block.student_name == holder]
+
+
+def verify_blocks(blocks):
+    for i in range(1, len(blocks)):
+        current_block = blocks[i]
+        previous_block = blocks[i-1]
+
+        # Re-calculate hash to ensure block data wasn't changed
+        if current_block.block_hash != current_block.calculate_block_hash():
+            return False
+        
+        # Check if previous hash matches
+        if current_block.previous_hash != previous_block.block_hash:
+            return False
+            
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Sharded mode
+#
+# With DOCUCHAIN_SHARDED=1 every issuer appends to its own linked sub-chain
+# (the `issuer_chains` collection) instead of the global chain, so issuers
+# don't contend on one tip and a single issuer's blocks can be loaded and
+# verified on their own. The head of each sub-chain is periodically anchored
+# into the global chain as an ANCHOR_DOCUMENT_TYPE block whose document_hash
+# is the sub-chain head's block_hash, tying every sub-chain back to the
+# global ledger.
+# ---------------------------------------------------------------------------
+
+ANCHOR_EVERY_BLOCKS = int(os.environ.get('ANCHOR_EVERY_BLOCKS', 100))
+ANCHOR_INTERVAL_SECONDS = int(os.environ.get('ANCHOR_INTERVAL_SECONDS', 3600))
+# Attempts to append when another worker keeps taking the chain head first
+APPEND_RETRIES = 5
+
+
+class IssuerChain(Blockchain):
+    """One issuer's sub-chain. Its genesis block names the issuer."""
+
+    def __init__(self, issuer):
+        super().__init__()
+        self.issuer = issuer
+
+    def load_chain(self):
+        # Read-only: an issuer without a sub-chain gets an empty chain, and the
+        # genesis block is written by load_head on its first append
+        try:
+            docs = list(get_issuer_chains_collection().find({"issuer": self.issuer}).sort([("index", 1)]))
+            self.chain = [Block.from_dict(b) for b in docs]
+        except Exception:
+            # If MongoDB is unreachable, keep whatever chain data we have
+            pass
+
+    def create_genesis_block(self):
+        genesis_block = Block(0, time.time(), "Genesis", self.issuer, "0", "0")
+        self.chain.append(genesis_block)
+        get_issuer_chains_collection().insert_one(genesis_block.to_dict())
+
+    def load_head(self):
+        # Appending only needs the head, not the whole sub-chain
+        docs = list(get_issuer_chains_collection().find({"issuer": self.issuer}).sort([("index", -1)]).limit(1))
+        if docs:
+            self.chain = [Block.from_dict(docs[0])]
+        else:
+            self.chain = []
+            self.create_genesis_block()
+        return self.chain[-1]
+
+    def add_block(self, document_type, issuer, document_hash, 
+                  student_name=None, cert_id=None, validity=None, student_image=None):
+        previous_block = self.get_latest_block()
+        new_block = Block(
+            index=previous_block.index + 1,
+            timestamp=time.time(),
+            document_type=document_type,
+            issuer=self.issuer,
+            document_hash=document_hash,
+            previous_hash=previous_block.block_hash,
+            student_name=student_name,
+            cert_id=cert_id,
+            validity=validity,
+            student_image=student_image
+        )
+        self.chain.append(new_block)
+        get_issuer_chains_collection().insert_one(new_block.to_dict())
+        return new_block
+
+
+class ShardedBlockchain(Blockchain):
+    """Global chain of anchors (plus pre-sharding blocks) over per-issuer sub-chains."""
+
+    def __init__(self, anchor_every=ANCHOR_EVERY_BLOCKS, anchor_interval=ANCHOR_INTERVAL_SECONDS):
+        super().__init__()
+        self.anchor_every = anchor_every
+        self.anchor_interval = anchor_interval
+        self._issuer_locks = {}
+        self._locks_lock = threading.Lock()
+        self._global_lock = threading.Lock()
+        # issuer -> (anchored sub-chain index, anchor timestamp). Other workers
+        # anchor too, so this only ever lags behind the database
+        self._last_anchor = {}
+        self._indexes_created = False
+
+    def _ensure_indexes(self):
+        if self._indexes_created:
+            return
+        collection = get_issuer_chains_collection()
+        collection.create_index([("issuer", 1), ("index", 1)], unique=True)
+        for field in LOOKUP_FIELDS:
+            collection.create_index(field)
+        collection.create_index("student_name")
+        # Anchors from different workers must not share a global index
+        get_blockchain_collection().create_index("index", unique=True)
+        # Dashboards read pre-sharding blocks from the global chain by query
+        get_blockchain_collection().create_index("issuer")
+        get_blockchain_collection().create_index("student_name")
+        self._indexes_created = True
+
+    def _issuer_lock(self, issuer):
+        with self._locks_lock:
+            return self._issuer_locks.setdefault(issuer, threading.Lock())
+
+    def add_block(self, document_type, issuer, document_hash, 
+                  student_name=None, cert_id=None, validity=None, student_image=None):
+        # Appends for different issuers proceed in parallel; the same issuer's
+        # appends are serialised here within a worker, and across workers by
+        # the unique (issuer, index) index
+        from pymongo.errors import DuplicateKeyError
+
+        self._ensure_indexes()
+        with self._issuer_lock(issuer):
+            for attempt in range(APPEND_RETRIES):
+                try:
+                    sub_chain = IssuerChain(issuer)
+                    sub_chain.load_head()
+                    new_block = sub_chain.add_block(document_type, issuer, document_hash,
+                                                    student_name, cert_id, validity, student_image)
+                    break
+                except DuplicateKeyError:
+                    # Another worker appended at this index first; retry on the new head
+                    if attempt == APPEND_RETRIES - 1:
+                        raise
+        self.maybe_anchor(issuer, new_block)
+        return new_block
+
+    def last_anchor(self, issuer, refresh=False):
+        if refresh or issuer not in self._last_anchor:
+            docs = list(get_blockchain_collection().find(
+                {"document_type": ANCHOR_DOCUMENT_TYPE, "issuer": issuer}).sort([("index", -1)]).limit(1))
+            if docs:
+                self._last_anchor[issuer] = (int(docs[0]["cert_id"].rsplit('-', 1)[-1]), docs[0]["timestamp"])
+            else:
+                self._last_anchor[issuer] = (0, 0)
+        return self._last_anchor[issuer]
+
+    def anchor_due(self, issuer, head, refresh=False):
+        anchored_index, anchored_at = self.last_anchor(issuer, refresh)
+        return (head.index - anchored_index >= self.anchor_every
+                or (head.index > anchored_index and time.time() - anchored_at >= self.anchor_interval))
+
+    def maybe_anchor(self, issuer, head):
+        # A stale cached anchor can only make one look due early, so confirm
+        # against the database before anchoring
+        if self.anchor_due(issuer, head) and self.anchor_due(issuer, head, refresh=True):
+            self.anchor(issuer, head)
+
+    def anchor(self, issuer, head=None):
+        """Anchor ``issuer``'s sub-chain head into the global chain.
+
+        Returns the anchor block, or None if another worker anchored this head
+        first.
+        """
+        from pymongo.errors import DuplicateKeyError
+
+        if head is None:
+            head = IssuerChain(issuer).load_head()
+        self._ensure_indexes()
+        with self._global_lock:
+            for attempt in range(APPEND_RETRIES):
+                try:
+                    global_chain = Blockchain()
+                    global_chain.load_head()
+                    anchor_block = global_chain.add_block(ANCHOR_DOCUMENT_TYPE, issuer, head.block_hash,
+                                                          cert_id=f"ANCHOR-{head.index}")
+                    break
+                except DuplicateKeyError:
+                    # Another worker appended at this index first
+                    if attempt == APPEND_RETRIES - 1:
+                        raise
+                    if head.index <= self.last_anchor(issuer, refresh=True)[0]:
+                        return None
+            self._last_anchor[issuer] = (head.index, anchor_block.timestamp)
+        return anchor_block
+
+    def anchor_heads(self):
+        """Anchor every sub-chain with blocks newer than its last anchor."""
+        anchored = []
+        for issuer in get_issuer_chains_collection().distinct("issuer"):
+            head = IssuerChain(issuer).load_head()
+            if head.index > self.last_anchor(issuer, refresh=True)[0]:
+                anchor_block = self.anchor(issuer, head)
+                if anchor_block:
+                    anchored.append(anchor_block)
+        return anchored
+
+    def issuer_chain(self, issuer):
+        sub_chain = IssuerChain(issuer)
+        sub_chain.load_chain()
+        return sub_chain
+
+    def verify_issuer(self, issuer):
+        """Verify one issuer's sub-chain and that every anchor of it matches."""
+        sub_chain = self.issuer_chain(issuer)
+        if not sub_chain.verify_chain():
+            return False
+        for anchor in get_blockchain_collection().find({"document_type": ANCHOR_DOCUMENT_TYPE, "issuer": issuer}):
+            index = int(anchor["cert_id"].rsplit('-', 1)[-1])
+            if index >= len(sub_chain.chain) or sub_chain.chain[index].block_hash != anchor["document_hash"]:
+                return False
+        return True
+
+    def find_document_hash(self, document_hash):
+        # Indexed reads, so callers don't need to load the global chain first
+        return self.lookup('document_hash', document_hash)
+
+    def lookup(self, field, value):
+        # Pre-sharding blocks on the global chain predate every sub-chain block
+        block = super().lookup(field, value)
+        if block:
+            return block
+        self._ensure_indexes()
+        docs = list(get_issuer_chains_collection().find(
+            {field: value, "document_type": {"$ne": "Genesis"}}).sort([("timestamp", 1)]).limit(1))
+        return Block.from_dict(docs[0]) if docs else None
+
+    def _global_blocks(self, field, value):
+        # Pre-sharding documents on the global chain, via the indexed field
+        try:
+            self._ensure_indexes()
+            docs = get_blockchain_collection().find(
+                {field: value, "document_type": {"$nin": NON_DOCUMENT_TYPES}}).sort([("index", 1)])
+            return [Block.from_dict(d) for d in docs]
+        except Exception:
+            # Like load_chain: show nothing rather than fail if MongoDB is unreachable
+            return []
+
+    def blocks_for_issuer(self, issuer):
+        return self._global_blocks("issuer", issuer) + self.issuer_chain(issuer).chain[1:]
+
+    def blocks_for_holder(self, holder):
+        try:
+            docs = list(get_issuer_chains_collection().find(
+                {"student_name": holder, "document_type": {"$ne": "Genesis"}}).sort([("timestamp", 1)]))
+        except Exception:
+            docs = []
+        return self._global_blocks("student_name", holder) + [Block.from_dict(d) for d in docs]
+
+
+if __name__ == '__main__':
+    # Periodic anchoring for quiet issuers, e.g. from a cron job:
+    #   python blockchain.py anchor
+    import sys
+    if sys.argv[1:] == ['anchor']:
+        for block in ShardedBlockchain().anchor_heads():
+            print(f"Anchored {block.issuer} at global block #{block.index}")
+    else:
+        print("usage: python blockchain.py anchor")
+        sys.exit(2)
@@ -0,0 +1,261 @@
+"""Streaming export/import of the chain for backups, migrations and replicas.
+
+    python chain_io.py export chain.ndjson.gz
+    python chain_io.py import chain.ndjson.gz --verify-only
+    python chain_io.py import chain.ndjson.gz [--replace] [--batch-size 5000]
+    python chain_io.py export subchains.ndjson.gz --collection issuer_chains
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+# Allow running as a script from anywhere
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from blockchain import Block
+from db import get_db, get_blockchain_collection, get_issuer_chains_collection
+
+# File layout (NDJSON, gzip-compressed when the path ends in .gz):
+#
+#   {"format": "docuchain-chain", "version": 1, "collection": ..., ...}    header
+#   {"index": 0, ..., "block_hash": ...}                                   one line per block
+#   {"checkpoint": {"count": N, "block_hash": ..., "digest": ...}}         every CHECKPOINT_EVERY blocks
+#   {"end": {"count": N, "block_hash": ..., "digest": ...}}                trailer
+#
+# "digest" is a running SHA-256 over every block line written so far, so a
+# truncated or corrupted file is caught at the next checkpoint rather than at
+# the very end. Block hashes and previous_hash links are re-verified on import
+# independently of the digest.
+FORMAT_NAME = "docuchain-chain"
+FORMAT_VERSION = 1
+CHECKPOINT_EVERY = int(os.environ.get('CHAIN_IO_CHECKPOINT_EVERY', 10000))
+IMPORT_BATCH_SIZE = int(os.environ.get('CHAIN_IO_BATCH_SIZE', 5000))
+
+COLLECTIONS = {
+    "blockchain": get_blockchain_collection,
+    # Per-issuer sub-chains (sharded mode); each issuer starts at its own genesis
+    "issuer_chains": get_issuer_chains_collection,
+}
+_SORT = {
+    "blockchain": [("index", 1)],
+    "issuer_chains": [("issuer", 1), ("index", 1)],
+}
+# Built on the staging collection before it is swapped in (see blockchain.py)
+_INDEXES = {
+    "blockchain": [("index", {"unique": True}), ("cert_id", {}), ("document_hash", {}),
+                   ("issuer", {}), ("student_name", {})],
+    "issuer_chains": [([("issuer", 1), ("index", 1)], {"unique": True}), ("cert_id", {}),
+                      ("document_hash", {}), ("student_name", {})],
+}
+STAGING_SUFFIX = "_import_staging"
+
+
+class ChainImportError(ValueError):
+    """Raised when an export file fails validation while it is being read."""
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 'b', compresslevel=6)
+    return open(path, mode + 'b')
+
+
+def _chain_key(collection_name, block):
+    return block.issuer if collection_name == "issuer_chains" else None
+
+
+def export_chain(path, collection_name="blockchain", checkpoint_every=CHECKPOINT_EVERY):
+    """Stream ``collection_name`` to ``path`` in index order; returns stats."""
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    count = 0
+    last_hash = None
+
+    with _open(path, 'w') as out:
+        header = {"format": FORMAT_NAME, "version": FORMAT_VERSION,
+                  "collection": collection_name, "exported_at": time.time()}
+        out.write(json.dumps(header).encode() + b'\n')
+
+        cursor = COLLECTIONS[collection_name]().find({}, {"_id": 0}).sort(_SORT[collection_name])
+        for doc in cursor:
+            doc.pop('_id', None)
+            line = json.dumps(doc, sort_keys=True).encode() + b'\n'
+            out.write(line)
+            digest.update(line)
+            count += 1
+            last_hash = doc.get("block_hash")
+            if count % checkpoint_every == 0:
+                checkpoint = {"count": count, "block_hash": last_hash, "digest": digest.hexdigest()}
+                out.write(json.dumps({"checkpoint": checkpoint}).encode() + b'\n')
+
+        end = {"count": count, "block_hash": last_hash, "digest": digest.hexdigest()}
+        out.write(json.dumps({"end": end}).encode() + b'\n')
+
+    return {"collection": collection_name, "blocks": count, "tip": last_hash,
+            "seconds": time.perf_counter() - started}
+
+
+def _verified_records(f, path, stats):
+    """Yield the collection name from the header, then each verified block dict.
+
+    Every block's hash is recomputed and its index, previous_hash link and the
+    file's checkpoints are checked as lines are read. Counts go into ``stats``.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    tips = {}
+    collection_name = None
+    ended = False
+
+    lines = enumerate(f, start=1)
+    while True:
+        try:
+            line_no, line = next(lines)
+        except StopIteration:
+            break
+        except (EOFError, OSError) as e:
+            # Truncated or corrupt gzip stream
+            raise ChainImportError(f"{path} could not be read after {count} blocks: {e}") from e
+
+        if ended:
+            raise ChainImportError(f"line {line_no}: data after the end marker")
+        try:
+            record = json.loads(line)
+
+            if line_no == 1:
+                if record.get("format") != FORMAT_NAME or record.get("version") != FORMAT_VERSION:
+                    raise ChainImportError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} export")
+                collection_name = record.get("collection", "blockchain")
+                if collection_name not in COLLECTIONS:
+                    raise ChainImportError(f"unknown collection {collection_name!r}")
+                stats['collection'] = collection_name
+                yield collection_name
+                continue
+
+            marker = record.get("checkpoint") or record.get("end")
+            if marker is not None:
+                if marker.get("count") != count or marker.get("digest") != digest.hexdigest():
+                    raise ChainImportError(f"line {line_no}: checkpoint mismatch after {count} blocks")
+                ended = "end" in record
+                continue
+
+            digest.update(line)
+            # from_dict without block_hash recomputes it from the contents
+            stored_hash = record.pop("block_hash", None)
+            block = Block.from_dict(record)
+        except ChainImportError:
+            raise
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Not JSON, not an object, or a block missing a required field
+            raise ChainImportError(f"line {line_no}: malformed record ({type(e).__name__}: {e})") from e
+
+        if block.block_hash != stored_hash:
+            raise ChainImportError(f"line {line_no}: block #{block.index} hash does not match its contents")
+
+        key = _chain_key(collection_name, block)
+        previous = tips.get(key)
+        if previous is None:
+            if block.index != 0 or key in tips:
+                raise ChainImportError(f"line {line_no}: chain does not start at a genesis block")
+        elif block.index != previous[0] + 1 or block.previous_hash != previous[1]:
+            raise ChainImportError(f"line {line_no}: block #{block.index} does not link to block #{previous[0]}")
+        tips[key] = (block.index, block.block_hash)
+
+        count += 1
+        stats['blocks'] = count
+        stats['chains'] = len(tips)
+        yield block.to_dict()
+
+    if collection_name is None:
+        raise ChainImportError(f"{path} is empty")
+    if not ended:
+        raise ChainImportError(f"{path} is truncated: no end marker after {count} blocks")
+
+
+def import_chain(path, verify_only=False, replace=False, batch_size=IMPORT_BATCH_SIZE):
+    """Validate ``path`` while streaming it and bulk-insert it in batches.
+
+    Blocks are written to a staging collection, one batch in memory at a
+    time, which only replaces the target collection once the whole file,
+    end marker included, has checked out. On any ChainImportError the
+    staging collection is dropped and the target is left untouched.
+    """
+    started = time.perf_counter()
+    stats = {"collection": None, "blocks": 0, "chains": 0, "verified_only": verify_only}
+
+    with _open(path, 'r') as f:
+        records = _verified_records(f, path, stats)
+        collection_name = next(records)
+
+        if verify_only:
+            for _ in records:
+                pass
+        else:
+            target = COLLECTIONS[collection_name]()
+            if not replace and target.count_documents({}):
+                raise ChainImportError(f"{collection_name} is not empty; use replace to overwrite it")
+
+            staging = get_db()[collection_name + STAGING_SUFFIX]
+            # Left over from an interrupted import
+            staging.drop()
+            try:
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        staging.insert_many(batch, ordered=False)
+                        batch = []
+                if batch:
+                    staging.insert_many(batch, ordered=False)
+                for keys, options in _INDEXES[collection_name]:
+                    staging.create_index(keys, **options)
+            except BaseException:
+                staging.drop()
+                raise
+            # Indexes move with the collection; the old one is dropped atomically
+            staging.rename(collection_name, dropTarget=True)
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="stream a chain collection to a file")
+    export.add_argument('path')
+    export.add_argument('--collection', choices=sorted(COLLECTIONS), default="blockchain")
+    export.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY)
+
+    load = commands.add_parser('import', help="verify a file and load it into the database")
+    load.add_argument('path')
+    load.add_argument('--verify-only', action='store_true', help="check the file without writing anything")
+    load.add_argument('--replace', action='store_true',
+                      help="replace the existing collection once the whole file has verified")
+    load.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        stats = export_chain(args.path, args.collection, args.checkpoint_every)
+        print(f"Exported {stats['blocks']} blocks from {stats['collection']} in {stats['seconds']:.1f}s")
+        return 0
+
+    try:
+        stats = import_chain(args.path, verify_only=args.verify_only, replace=args.replace,
+                             batch_size=args.batch_size)
+    except (ChainImportError, OSError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    action = "Verified" if stats['verified_only'] else "Imported"
+    print(f"{action} {stats['blocks']} blocks ({stats['chains']} chain(s)) into {stats['collection']} "
+          f"in {stats['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,21 +1,69 @@
 import os
-from pymongo import MongoClient
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Use localhost fallback for local development if NO MONGO_URI is found
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-client = MongoClient(
-    MONGO_URI,
-    serverSelectionTimeoutMS=10000,
-    connectTimeoutMS=10000,
-    socketTimeoutMS=20000,
-    retryWrites=True,
-    retryReads=True,
-)
-db = client['docuchain_db']
-
-users_collection = db['users']
-requests_collection = db['requests']
-blockchain_collection = db['blockchain']
+
+# The client is created on first use rather than at import time: importing
+# pymongo and resolving the URI is a large share of worker boot, and routes
+# such as /health never touch the database. It also means each gunicorn worker
+# opens its own client after the fork instead of inheriting the master's.
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from pymongo import MongoClient
+                _client = MongoClient(
+                    MONGO_URI,
+                    serverSelectionTimeoutMS=10000,
+                    connectTimeoutMS=10000,
+                    socketTimeoutMS=20000,
+                    retryWrites=True,
+                    retryReads=True,
+                )
+    return _client
+
+def get_db():
+    return get_client()['docuchain_db']
+
+def get_users_collection():
+    return get_db()['users']
+
+def get_requests_collection():
+    return get_db()['requests']
+
+def get_blockchain_collection():
+    return get_db()['blockchain']
+
+def get_blobs_collection():
+    return get_db()['blobs']
+
+def get_issuer_chains_collection():
+    return get_db()['issuer_chains']
+
+# Async client for the asyncio verification service (verify_service.py).
+# Created on first use inside the worker's event loop; one per process.
+_async_client = None
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        from pymongo import AsyncMongoClient
+        _async_client = AsyncMongoClient(
+            MONGO_URI,
+            serverSelectionTimeoutMS=10000,
+            connectTimeoutMS=10000,
+            socketTimeoutMS=20000,
+            retryReads=True,
+        )
+    return _async_client
+
+def get_async_db():
+    return get_async_client()['docuchain_db']
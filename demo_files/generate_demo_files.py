@@ -1,11 +1,19 @@
+import argparse
 import hashlib
 import json
 import time
 import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor
+
+# Allow running both as `python -m demo_files.generate_demo_files` from the repo
+# root and as a plain script from inside demo_files/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from blockchain import Block, Blockchain
 
 def calculate_hash(content):
@@ -191,5 +199,254 @@ def generate_demo_files():
     print("In your demo, use 'satya_sunny_diploma.pdf' to show VERIFIED.")
     print("Use 'satya_sunny_fake_diploma.pdf' to show TAMPERED.")
 
+# ---------------------------------------------------------------------------
+# Large-scale synthetic data
+#
+# Everything below produces production-shaped data for capacity planning and
+# benchmarking. Blocks are written straight into the chain collection with
+# insert_many, bypassing Blockchain.add_block (one round trip per block).
+# ---------------------------------------------------------------------------
+
+SYNTHETIC_ISSUERS = [
+    # (issuer, cert_id prefix, relative share of issuance volume)
+    ("Bhagwan Parshuram Institute of Technology", "BPIT", 18),
+    ("Delhi Technological University", "DTU", 16),
+    ("Netaji Subhas University of Technology", "NSUT", 12),
+    ("Indian Institute of Technology Delhi", "IITD", 10),
+    ("Indraprastha Institute of Information Technology", "IIITD", 8),
+    ("Guru Gobind Singh Indraprastha University", "GGSIPU", 14),
+    ("Jamia Millia Islamia", "JMI", 9),
+    ("University of Delhi", "DU", 20),
+    ("Central Board of Secondary Education", "CBSE", 25),
+    ("National Skill Development Corporation", "NSDC", 6),
+    ("Coursera Inc.", "COURSERA", 7),
+    ("Amazon Web Services Training", "AWS", 5),
+]
+
+SYNTHETIC_DOCUMENT_TYPES = [
+    ("Academic Certificate", 40),
+    ("Degree Transcript", 20),
+    ("Provisional Certificate", 10),
+    ("Character Certificate", 8),
+    ("Internship Completion Letter", 9),
+    ("Professional Certification", 10),
+    ("Employment Verification", 3),
+]
+
+SYNTHETIC_VALIDITY = [("Lifetime", 70), ("5 Years", 10), ("3 Years", 10), ("2 Years", 6), ("1 Year", 4)]
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna", "Ishaan",
+               "Ananya", "Diya", "Aadhya", "Saanvi", "Pari", "Anika", "Navya", "Myra", "Kiara", "Riya",
+               "Raunak", "Harsh", "Mihir", "Satya", "Kabir", "Rohan", "Meera", "Tara", "Neha", "Priya",
+               "Rahul", "Sneha", "Vikram", "Pooja", "Karan", "Aisha", "Dev", "Nikhil", "Simran", "Yash"]
+LAST_NAMES = ["Gupta", "Sharma", "Verma", "Singh", "Kumar", "Jadaun", "Sunny", "Patel", "Reddy", "Iyer",
+              "Nair", "Menon", "Chopra", "Malhotra", "Bansal", "Agarwal", "Mehta", "Joshi", "Kapoor", "Das",
+              "Bose", "Chatterjee", "Mukherjee", "Rao", "Pillai", "Khan", "Ahmed", "Yadav", "Mishra", "Tiwari"]
+
+PHOTO_URL = "https://res.cloudinary.com/docuchain/image/upload/v{version}/docuchain/photos/{photo_hash}.jpg"
+
+
+def _weighted(options):
+    values = [o[:-1] if len(o) > 2 else o[0] for o in options]
+    weights = [o[-1] for o in options]
+    return values, weights
+
+
+def synthetic_document(seed, index):
+    # The "file" whose SHA-256 is anchored at a synthetic block. Callers can
+    # rebuild it to exercise /verify against a generated chain.
+    return f"docuchain-synthetic-document:{seed}:{index}".encode()
+
+
+def synthetic_holders(rng, count):
+    holders = []
+    seen = set()
+    while len(holders) < count:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in seen:
+            # Disambiguate common names the way real rosters do
+            name = f"{name} {len(holders)}"
+        seen.add(name)
+        photo_hash = hashlib.sha256(f"photo:{name}".encode()).hexdigest()
+        # Roughly one holder in ten never uploaded a photo
+        photo_url = "" if rng.random() < 0.1 else PHOTO_URL.format(
+            version=1700000000 + rng.randrange(10 ** 7), photo_hash=photo_hash)
+        holders.append((name, photo_url))
+    return holders
+
+
+def iter_synthetic_blocks(previous_block, count, seed=0, holders=None, start_time=None, span_seconds=None):
+    """Yield ``count`` Blocks linked onto ``previous_block``.
+
+    Generation is deterministic for a given seed and tip, so the same chain can
+    be reproduced across machines. Timestamps increase monotonically from
+    ``start_time`` (default: just after the tip) and never pass
+    ``start_time + span_seconds`` or the current time.
+    """
+    rng = random.Random(f"{seed}:{previous_block.block_hash}")
+    issuers, issuer_weights = _weighted(SYNTHETIC_ISSUERS)
+    doc_types, doc_type_weights = _weighted(SYNTHETIC_DOCUMENT_TYPES)
+    validities, validity_weights = _weighted(SYNTHETIC_VALIDITY)
+    if holders is None:
+        # Holders typically collect several documents each
+        holders = synthetic_holders(rng, max(100, count // 4))
+
+    now = time.time()
+    if start_time is None:
+        start_time = max(previous_block.timestamp, now - 3 * 365 * 86400)
+    if span_seconds is None:
+        span_seconds = now - start_time
+    end_time = max(start_time, min(now, start_time + span_seconds))
+
+    timestamp = start_time
+    index = previous_block.index
+    previous_hash = previous_block.block_hash
+    # Draw categorical fields in bulk; rng.choices is far cheaper per item this way
+    issuer_draws = rng.choices(issuers, issuer_weights, k=count)
+    doc_type_draws = rng.choices(doc_types, doc_type_weights, k=count)
+    validity_draws = rng.choices(validities, validity_weights, k=count)
+
+    for i in range(count):
+        index += 1
+        # Jittered share of the time left; at most 1.8/(k+1) of it with k
+        # blocks remaining, so the walk can never overshoot end_time
+        timestamp += rng.uniform(0.2, 1.8) * (end_time - timestamp) / (count - i + 1)
+        issuer, prefix = issuer_draws[i]
+        student_name, photo_url = holders[rng.randrange(len(holders))]
+        doc_hash = hashlib.sha256(synthetic_document(seed, index)).hexdigest()
+        cert_id = f"{prefix}-{int(timestamp) // 31557600 + 1970}-" \
+                  f"{hashlib.md5((student_name + doc_hash).encode()).hexdigest()[:8].upper()}"
+        block = Block(
+            index=index,
+            timestamp=timestamp,
+            document_type=doc_type_draws[i],
+            issuer=issuer,
+            document_hash=doc_hash,
+            previous_hash=previous_hash,
+            student_name=student_name,
+            cert_id=cert_id,
+            validity=validity_draws[i],
+            student_image=photo_url,
+        )
+        previous_hash = block.block_hash
+        yield block
+
+
+def get_chain_tip(collection):
+    """Return the latest Block in ``collection``, creating the genesis block if empty."""
+    docs = list(collection.find().sort([("index", -1)]).limit(1))
+    if docs:
+        return Block.from_dict(docs[0])
+    genesis = Block(0, time.time() - 3 * 365 * 86400, "Genesis", "System", "0", "0")
+    collection.insert_one(genesis.to_dict())
+    return genesis
+
+
+def generate_synthetic_chain(collection, count, batch_size=10000, seed=0, progress=True, **kwargs):
+    """Append ``count`` synthetic blocks to ``collection`` with bulk inserts.
+
+    Memory use is bounded by ``batch_size``; returns the new tip Block.
+    """
+    tip = get_chain_tip(collection)
+    batch = []
+    started = time.time()
+    written = 0
+    for block in iter_synthetic_blocks(tip, count, seed=seed, **kwargs):
+        batch.append(block.to_dict())
+        tip = block
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=True)
+            written += len(batch)
+            batch = []
+            if progress:
+                rate = written / max(time.time() - started, 1e-9)
+                print(f"  {written:,}/{count:,} blocks ({rate:,.0f} blocks/s)", flush=True)
+    if batch:
+        collection.insert_many(batch, ordered=True)
+        written += len(batch)
+    if progress:
+        print(f"Wrote {written:,} blocks in {time.time() - started:.1f}s; tip is #{tip.index}")
+    return tip
+
+
+def _render_synthetic_pdf(job):
+    path, name, degree, year = job
+    create_certificate_pdf(path, name, degree, year)
+    with open(path, "rb") as f:
+        return path, name, calculate_hash(f.read())
+
+
+def render_pdf_batch(out_dir, count, workers=None, seed=0):
+    """Render ``count`` realistic diplomas in parallel worker processes.
+
+    Returns a list of (path, holder name, sha256) tuples.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    degrees = ["Bachelor of Technology in Computer Science", "Bachelor of Technology in Electronics and Communications",
+               "Master of Business Administration", "Bachelor of Commerce", "Master of Science in Physics"]
+    jobs = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        filename = f"synthetic_{seed}_{i:06d}.pdf"
+        jobs.append((os.path.join(out_dir, filename), name, rng.choice(degrees), str(rng.randint(2015, 2026))))
+
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_render_synthetic_pdf, jobs, chunksize=max(1, count // 64)))
+    print(f"Rendered {count:,} PDFs into {out_dir} in {time.time() - started:.1f}s")
+    return results
+
+
+def anchor_pdfs(collection, rendered, issuer="Bhagwan Parshuram Institute of Technology", batch_size=10000):
+    # Anchor rendered PDFs so they verify as genuine through /verify
+    tip = get_chain_tip(collection)
+    batch = []
+    for path, name, doc_hash in rendered:
+        cert_id = f"BPIT-2026-{hashlib.md5((name + doc_hash).encode()).hexdigest()[:8].upper()}"
+        # Never older than the block before it (the tip may be synthetic)
+        tip = Block(tip.index + 1, max(tip.timestamp, time.time()), "Academic Certificate", issuer, doc_hash, tip.block_hash,
+                    student_name=name, cert_id=cert_id, validity="Lifetime")
+        batch.append(tip.to_dict())
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=True)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=True)
+    print(f"Anchored {len(rendered):,} PDFs; tip is #{tip.index}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate DocuChain demo files, or production-scale synthetic chains and PDFs.")
+    parser.add_argument("--blocks", type=int, default=0, help="number of synthetic blocks to append to the chain")
+    parser.add_argument("--batch-size", type=int, default=10000, help="blocks per insert_many call")
+    parser.add_argument("--holders", type=int, help="size of the holder population (default: blocks / 4)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for reproducible data")
+    parser.add_argument("--pdfs", type=int, default=0, help="number of PDF diplomas to render")
+    parser.add_argument("--pdf-dir", default="synthetic_pdfs", help="output directory for rendered PDFs")
+    parser.add_argument("--workers", type=int, help="PDF worker processes (default: CPU count)")
+    parser.add_argument("--anchor-pdfs", action="store_true", help="also anchor rendered PDFs on the chain")
+    args = parser.parse_args(argv)
+
+    if not args.blocks and not args.pdfs:
+        generate_demo_files()
+        return
+
+    from db import get_blockchain_collection
+    blockchain_collection = get_blockchain_collection()
+
+    if args.blocks:
+        holders = synthetic_holders(random.Random(args.seed), args.holders) if args.holders else None
+        print(f"Generating {args.blocks:,} synthetic blocks...")
+        generate_synthetic_chain(blockchain_collection, args.blocks, batch_size=args.batch_size,
+                                 seed=args.seed, holders=holders)
+
+    if args.pdfs:
+        rendered = render_pdf_batch(args.pdf_dir, args.pdfs, workers=args.workers, seed=args.seed)
+        if args.anchor_pdfs:
+            anchor_pdfs(blockchain_collection, rendered, batch_size=args.batch_size)
+
+
 if __name__ == "__main__":
-    generate_demo_files()
+    main()
@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """Thread-safe LRU cache for rendered HTML fragments."""
+
+    def __init__(self, maxsize=20000):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ChainListing:
+    """Latest-first HTML listing of the chain, assembled from per-block fragments.
+
+    Blocks are immutable once anchored, so a fragment keyed by
+    (block_hash, variant) never goes stale. The assembled listing for each
+    variant is remembered together with the tip it was built for; when new
+    blocks arrive on top of that tip only their fragments are rendered and
+    prepended. Any other change (a different chain, a shorter one) rebuilds
+    the listing from the fragment cache.
+    """
+
+    def __init__(self, render_fragment, separator, fragments=None):
+        self.render_fragment = render_fragment
+        self.separator = separator
+        self.fragments = fragments if fragments is not None else FragmentCache()
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def fragment(self, block, variant):
+        key = (block.block_hash, variant)
+        html = self.fragments.get(key)
+        if html is None:
+            html = self.render_fragment(block, variant)
+            self.fragments.set(key, html)
+        return html
+
+    def render(self, chain, variant):
+        with self._lock:
+            cached = self._listings.get(variant)
+
+        html = ''
+        new_blocks = chain
+        if cached:
+            length, tip_hash, cached_html = cached
+            if len(chain) >= length and chain[length - 1].block_hash == tip_hash:
+                html = cached_html
+                new_blocks = chain[length:]
+
+        if new_blocks or not cached:
+            parts = [self.fragment(b, variant) for b in reversed(new_blocks)]
+            if html:
+                parts.append(html)
+            html = self.separator.join(parts)
+            if chain:
+                with self._lock:
+                    self._listings[variant] = (len(chain), chain[-1].block_hash, html)
+        return html
+
+    def clear(self):
+        self.fragments.clear()
+        with self._lock:
+            self._listings.clear()
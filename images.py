@@ -0,0 +1,112 @@
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fragment_cache import FragmentCache
+from storage import lookup_blob, upload_blob
+
+# Holder photos and avatars are uploaded at full camera resolution but never
+# shown larger than ~150 CSS px. Fixed-size derivatives are generated at upload
+# time and stored content-addressed next to the original, i.e. the photo
+# docuchain/photos/<sha256> gets docuchain/photos/<sha256>_96_webp and
+# _320_webp. The pixel size and format are part of the ID, so changing either
+# setting generates new derivatives instead of reusing the old ones.
+DERIVATIVE_SIZES = {
+    "sm": 96,    # navbar avatar (35px)
+    "lg": 320,   # document / verify / profile photo (120-150px)
+}
+DERIVATIVE_FORMAT = os.environ.get('PHOTO_DERIVATIVE_FORMAT', 'WEBP').upper()
+DERIVATIVE_QUALITY = int(os.environ.get('PHOTO_DERIVATIVE_QUALITY', 80))
+PHOTO_FOLDER = "docuchain/photos"
+
+_PHOTO_HASH = re.compile(r'/([0-9a-f]{64})(?:\.\w+)?$')
+
+# Pillow releases the GIL while decoding, resizing and encoding, so a small
+# thread pool keeps this work off the request threads without the cost of
+# shipping multi-MB photos to another process.
+_pool = None
+_pool_lock = threading.Lock()
+
+# Photos without derivatives (uploaded before this pipeline existed, or still
+# being processed) are remembered briefly so templates don't query the blob
+# index on every render. Bounded, as every legacy photo would otherwise stay
+# in it for the life of the worker.
+_missing = FragmentCache(int(os.environ.get('PHOTO_MISSING_CACHE_SIZE', 10000)))
+MISSING_TTL = 60
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=int(os.environ.get('PHOTO_DERIVATIVE_WORKERS', 2)),
+                                           thread_name_prefix="photo-derivatives")
+    return _pool
+
+
+def derivative_id(photo_hash, size):
+    return f"{photo_hash}_{DERIVATIVE_SIZES[size]}_{DERIVATIVE_FORMAT.lower()}"
+
+
+def render_derivatives(photo_data):
+    """Return {size: encoded bytes} for every entry in DERIVATIVE_SIZES."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(photo_data)) as original:
+        # Respect camera orientation before the EXIF data is dropped
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    rendered = {}
+    for size, pixels in DERIVATIVE_SIZES.items():
+        derivative = image.copy()
+        derivative.thumbnail((pixels, pixels), Image.LANCZOS)
+        buffer = io.BytesIO()
+        derivative.save(buffer, DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY, optimize=True)
+        rendered[size] = buffer.getvalue()
+    return rendered
+
+
+def generate_derivatives(photo_data, photo_hash):
+    try:
+        rendered = render_derivatives(photo_data)
+    except Exception:
+        # Not an image Pillow understands; templates keep using the original
+        return {}
+
+    urls = {}
+    for size, data in rendered.items():
+        buffer = io.BytesIO(data)
+        buffer.name = f"{derivative_id(photo_hash, size)}.{DERIVATIVE_FORMAT.lower()}"
+        urls[size] = upload_blob(buffer, folder=PHOTO_FOLDER, public_id=derivative_id(photo_hash, size))
+    return urls
+
+
+def schedule_derivatives(photo_data, photo_hash):
+    """Queue derivative generation for an uploaded photo; returns the Future or None."""
+    if all(lookup_blob(PHOTO_FOLDER, derivative_id(photo_hash, size)) for size in DERIVATIVE_SIZES):
+        return None
+    for size in DERIVATIVE_SIZES:
+        _missing.discard(derivative_id(photo_hash, size))
+    return _get_pool().submit(generate_derivatives, photo_data, photo_hash)
+
+
+def derivative_url(photo_url, size):
+    """Return the URL of the ``size`` derivative of ``photo_url``, or the original."""
+    match = _PHOTO_HASH.search(photo_url or '')
+    if not match or size not in DERIVATIVE_SIZES:
+        return photo_url
+
+    key = derivative_id(match.group(1), size)
+    missing_since = _missing.get(key)
+    if missing_since and time.time() - missing_since < MISSING_TTL:
+        return photo_url
+
+    url = lookup_blob(PHOTO_FOLDER, key)
+    if url:
+        return url
+    _missing.set(key, time.time())
+    return photo_url
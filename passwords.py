@@ -0,0 +1,187 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# Password hashing is deliberately CPU-expensive and holds the GIL, so running
+# it on a gthread request thread stalls every other request in the worker.
+# Hashes are computed in a small process pool instead.
+#
+# PASSWORD_HASH_METHOD is any werkzeug method string, e.g. "scrypt:32768:8:1"
+# or "pbkdf2:sha256:600000". Stored hashes made with a different method are
+# transparently upgraded on the next successful login.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS', 2))
+# Hash jobs allowed to wait for the pool; beyond that requests are turned away
+PASSWORD_POOL_QUEUE = int(os.environ.get('PASSWORD_POOL_QUEUE', PASSWORD_POOL_WORKERS * 8))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+LOGIN_MAX_ATTEMPTS = int(os.environ.get('LOGIN_MAX_ATTEMPTS', 5))
+LOGIN_WINDOW_SECONDS = int(os.environ.get('LOGIN_WINDOW_SECONDS', 300))
+# Usernames tracked at once; guesses against many distinct names can't grow it
+LOGIN_LIMITER_MAX_USERS = int(os.environ.get('LOGIN_LIMITER_MAX_USERS', 10000))
+
+
+class PasswordHashBusy(Exception):
+    """Raised when the hashing pool is saturated or too slow to answer."""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+# After repeated pool crashes (e.g. a platform that can't spawn processes)
+# hashing falls back to the calling thread rather than respawning forever
+_pool_failures = 0
+MAX_POOL_FAILURES = 3
+_slots = threading.BoundedSemaphore(PASSWORD_POOL_WORKERS + PASSWORD_POOL_QUEUE)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: forking a multi-threaded gunicorn worker is unsafe
+                _pool = ProcessPoolExecutor(max_workers=PASSWORD_POOL_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _reset_pool():
+    global _pool, _pool_failures
+    with _pool_lock:
+        _pool = None
+        _pool_failures += 1
+
+
+def _generate(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _check(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+def _run(func, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordHashBusy()
+    release = True
+    try:
+        if _pool_failures >= MAX_POOL_FAILURES:
+            return func(*args)
+        future = _get_pool().submit(func, *args)
+        try:
+            return future.result(timeout=PASSWORD_HASH_TIMEOUT)
+        except FutureTimeoutError:
+            if not future.cancel():
+                # Already running in the pool: it keeps its slot until it
+                # finishes, so timeouts can't push more work onto the pool
+                release = False
+                future.add_done_callback(lambda f: _slots.release())
+            raise PasswordHashBusy()
+    except BrokenProcessPool:
+        # A pool worker died; start a fresh pool next time and answer inline now
+        _reset_pool()
+        return func(*args)
+    finally:
+        if release:
+            _slots.release()
+
+
+def expanded_method(method):
+    """The method string werkzeug stores in hashes made with ``method``.
+
+    werkzeug expands defaults ("scrypt" -> "scrypt:32768:8:1", "pbkdf2" ->
+    "pbkdf2:sha256:<DEFAULT_PBKDF2_ITERATIONS>"); this follows the same rules
+    so needs_rehash can compare prefixes without computing a hash.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = map(int, args) if len(args) == 3 else (2 ** 15, 8, 1)
+        return f"scrypt:{n}:{r}:{p}"
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    return method
+
+
+_method_prefix = expanded_method(PASSWORD_HASH_METHOD)
+
+
+def hash_password(password):
+    return _run(_generate, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(pwhash, password):
+    if not pwhash or password is None:
+        return False
+    return _run(_check, pwhash, password)
+
+
+def needs_rehash(pwhash):
+    # werkzeug hashes look like "<method>$<salt>$<hash>"
+    if not pwhash:
+        return False
+    return pwhash.split('$', 1)[0] != _method_prefix
+
+
+class LoginLimiter:
+    """Per-username failed-attempt limiter (sliding window, per worker process).
+
+    Checked before any hashing so that a burst of guesses against one account
+    can't tie up the hashing pool.
+    """
+
+    def __init__(self, max_attempts=LOGIN_MAX_ATTEMPTS, window=LOGIN_WINDOW_SECONDS,
+                 max_users=LOGIN_LIMITER_MAX_USERS):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_users = max_users
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def _sweep(self, now):
+        # Drop usernames whose failures have all expired, at most once a window
+        if now - self._last_sweep >= self.window:
+            self._last_sweep = now
+            for username in list(self._failures):
+                self._recent(username, now)
+        # Still too many: forget the longest-tracked usernames first
+        while len(self._failures) > self.max_users:
+            del self._failures[next(iter(self._failures))]
+
+    def _recent(self, username, now):
+        failures = [t for t in self._failures.get(username, ()) if now - t < self.window]
+        if failures:
+            self._failures[username] = failures
+        else:
+            self._failures.pop(username, None)
+        return failures
+
+    def retry_after(self, username):
+        """Seconds until ``username`` may try again, or 0 if not blocked."""
+        now = time.time()
+        with self._lock:
+            failures = self._recent(username, now)
+            if len(failures) < self.max_attempts:
+                return 0
+            return int(self.window - (now - failures[-self.max_attempts])) + 1
+
+    def record_failure(self, username):
+        now = time.time()
+        with self._lock:
+            self._recent(username, now)
+            self._failures.setdefault(username, []).append(now)
+            self._sweep(now)
+
+    def reset(self, username):
+        with self._lock:
+            self._failures.pop(username, None)
+
+
+login_limiter = LoginLimiter()
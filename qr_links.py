@@ -0,0 +1,53 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Shared by app.py (sessions and QR links) and verify_service.py so the two
+# servers always sign and check QR links with the same key.
+DEFAULT_SECRET_KEY = 'docuchain_offline_demo_secret'
+SECRET_KEY = os.environ.get('SECRET_KEY', DEFAULT_SECRET_KEY)
+QR_SIGNING_SALT = 'docuchain-qr'
+# Hex characters of the document hash carried in a QR link; enough to tell
+# documents apart, short enough to keep the QR code small
+QR_HASH_PREFIX = 16
+
+# QR codes link to /c/<cert_id>?s=<hash prefix>.<signature>. The signature is
+# an HMAC under SECRET_KEY, so only this server can check it: it proves the
+# link was printed by this deployment for that exact document, it is not an
+# offline proof. With the public default key anyone could forge one, so no
+# signature is added until SECRET_KEY is set.
+_signer = None
+
+
+def _get_signer():
+    global _signer
+    if _signer is None:
+        from itsdangerous import Signer
+        _signer = Signer(SECRET_KEY, salt=QR_SIGNING_SALT)
+    return _signer
+
+
+def signing_enabled():
+    return SECRET_KEY != DEFAULT_SECRET_KEY
+
+
+def sign_qr_link(cert_id, document_hash):
+    """The ``s`` query value for a QR link, or None when signing is disabled."""
+    if not signing_enabled():
+        return None
+    prefix = document_hash[:QR_HASH_PREFIX]
+    signature = _get_signer().get_signature(f"{cert_id}:{prefix}").decode()
+    return f"{prefix}.{signature}"
+
+
+def check_qr_link(cert_id, token):
+    """Return the signed document hash prefix from ``token``, or None if invalid."""
+    if not signing_enabled() or not token:
+        return None
+    prefix, _, signature = token.partition('.')
+    if len(prefix) != QR_HASH_PREFIX:
+        return None
+    if not _get_signer().verify_signature(f"{cert_id}:{prefix}".encode(), signature.encode()):
+        return None
+    return prefix
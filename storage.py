@@ -0,0 +1,70 @@
+import time
+
+from db import get_blobs_collection
+
+# cloudinary (and its admin API) is imported on first use; it is not needed
+# to boot a worker or to serve read-only pages.
+
+# Known-blob index: "folder/public_id" -> secure_url. Every upload is named by
+# the SHA-256 of its content, so an entry here means the exact bytes are
+# already on Cloudinary and the upload can be skipped. Persisted in the
+# `blobs` collection and cached per worker in memory.
+_known_blobs = {}
+
+
+def lookup_blob(folder, public_id):
+    key = f"{folder}/{public_id}"
+    url = _known_blobs.get(key)
+    if url:
+        return url
+    try:
+        doc = get_blobs_collection().find_one({"_id": key})
+    except Exception:
+        # Index unavailable: fall back to uploading, which is always correct
+        return None
+    if doc and doc.get('secure_url'):
+        _known_blobs[key] = doc['secure_url']
+        return doc['secure_url']
+    return None
+
+
+def upload_blob(file, folder, public_id, **options):
+    """Upload ``file`` as folder/public_id unless that content is already stored.
+
+    ``public_id`` must be derived from the file's hash. Returns the secure URL.
+    """
+    url = lookup_blob(folder, public_id)
+    if url:
+        return url
+
+    import cloudinary.uploader
+    result = cloudinary.uploader.upload(file, folder=folder, public_id=public_id, **options)
+    url = result.get('secure_url')
+    if url:
+        key = f"{folder}/{public_id}"
+        _known_blobs[key] = url
+        try:
+            get_blobs_collection().update_one({"_id": key}, {"$set": {
+                "secure_url": url,
+                "bytes": result.get('bytes'),
+                "resource_type": result.get('resource_type'),
+                "uploaded_at": time.time(),
+            }}, upsert=True)
+        except Exception:
+            pass
+    return url
+
+
+def find_resource_url(public_id):
+    """Return the secure URL of an existing Cloudinary resource, or None."""
+    folder, _, name = public_id.rpartition('/')
+    url = lookup_blob(folder, name)
+    if url:
+        return url
+
+    import cloudinary.api
+    import cloudinary.exceptions
+    try:
+        return cloudinary.api.resource(public_id).get('secure_url')
+    except cloudinary.exceptions.NotFound:
+        return None
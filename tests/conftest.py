@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import stubs  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A fresh in-memory database (and local file storage) for each test."""
+    database, _ = stubs.install(storage_root=str(tmp_path / "storage"))
+    return database
@@ -0,0 +1,92 @@
+import gzip
+import json
+
+import pytest
+
+import chain_io
+from benchmarks.bench_chain import seed_chain
+
+
+def _chain(database):
+    return [(d["index"], d["block_hash"]) for d in database["blockchain"].find().sort([("index", 1)])]
+
+
+def _rewrite(path, edit):
+    with gzip.open(path, 'rb') as f:
+        lines = f.readlines()
+    with gzip.open(path, 'wb') as f:
+        f.writelines(edit(lines))
+
+
+@pytest.fixture
+def export(database, tmp_path):
+    seed_chain(database["blockchain"], 250)
+    path = str(tmp_path / "chain.ndjson.gz")
+    chain_io.export_chain(path, checkpoint_every=100)
+    return path
+
+
+def test_round_trip(database, export):
+    original = _chain(database)
+    stats = chain_io.import_chain(export, replace=True, batch_size=64)
+    assert stats["blocks"] == 250
+    assert _chain(database) == original
+
+
+def test_verify_only_writes_nothing(database, export):
+    database["blockchain"].delete_many({})
+    stats = chain_io.import_chain(export, verify_only=True)
+    assert stats["blocks"] == 250
+    assert database["blockchain"].count_documents({}) == 0
+
+
+def test_refuses_non_empty_target_without_replace(database, export):
+    with pytest.raises(chain_io.ChainImportError, match="not empty"):
+        chain_io.import_chain(export)
+
+
+def test_corrupt_block_keeps_existing_chain(database, export):
+    original = _chain(database)
+
+    def tamper(lines):
+        # Header is line 0, so line 200 holds block #199 (after one checkpoint)
+        record = json.loads(lines[200])
+        record["validity"] = "Forever"
+        lines[200] = json.dumps(record, sort_keys=True).encode() + b'\n'
+        return lines
+
+    _rewrite(export, tamper)
+    with pytest.raises(chain_io.ChainImportError):
+        chain_io.import_chain(export, replace=True, batch_size=16)
+    assert _chain(database) == original
+    assert "blockchain" + chain_io.STAGING_SUFFIX not in database.list_collection_names()
+
+
+def test_truncated_file_keeps_existing_chain(database, export):
+    original = _chain(database)
+    _rewrite(export, lambda lines: lines[:-1])
+    with pytest.raises(chain_io.ChainImportError, match="truncated"):
+        chain_io.import_chain(export, replace=True, batch_size=16)
+    assert _chain(database) == original
+
+
+def test_truncated_gzip_stream(database, export):
+    with open(export, 'rb') as f:
+        data = f.read()
+    with open(export, 'wb') as f:
+        f.write(data[:len(data) // 2])
+    with pytest.raises(chain_io.ChainImportError):
+        chain_io.import_chain(export, verify_only=True)
+
+
+@pytest.mark.parametrize("bad_line", [b"not json\n", b'{"index": 5}\n', b"[1, 2]\n"])
+def test_malformed_lines_raise_import_error(database, export, bad_line):
+    _rewrite(export, lambda lines: lines[:10] + [bad_line] + lines[10:])
+    with pytest.raises(chain_io.ChainImportError, match="line 11"):
+        chain_io.import_chain(export, verify_only=True)
+
+
+def test_cli_reports_failures_without_traceback(database, export, capsys):
+    _rewrite(export, lambda lines: lines[:10] + [b"not json\n"] + lines[10:])
+    assert chain_io.main(["import", export, "--replace"]) == 1
+    assert "Import failed: line 11" in capsys.readouterr().err
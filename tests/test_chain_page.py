@@ -0,0 +1,36 @@
+import gzip
+
+import pytest
+
+from benchmarks.bench_chain import seed_chain
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def client(database):
+    seed_chain(database["blockchain"], 30)
+    import app as docuchain
+    docuchain._compressed_chain_pages = None
+    docuchain._blockchain = None
+    return docuchain.app.test_client()
+
+
+def test_gzipped_chain_page_matches_plain_page(client):
+    plain = client.get("/chain").data
+    response = client.get("/chain", headers=GZIP)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == plain
+
+
+def test_compressed_page_is_reused_until_the_tip_changes(client, monkeypatch):
+    import app as docuchain
+    first = client.get("/chain", headers=GZIP).data
+    monkeypatch.setattr(docuchain.assets, "gzip_bytes", lambda data: pytest.fail("page re-compressed"))
+    assert client.get("/chain", headers=GZIP).data == first
+    monkeypatch.undo()
+
+    block = docuchain.get_blockchain().add_block("Degree", "Test University", "ab" * 32, "New Holder")
+    page = gzip.decompress(client.get("/chain", headers=GZIP).data)
+    assert block.block_hash.encode() in page
@@ -0,0 +1,53 @@
+import hashlib
+import io
+
+from PIL import Image
+
+import images
+from fragment_cache import FragmentCache
+
+PHOTO_HASH = "ab" * 32
+PHOTO_URL = f"https://res.cloudinary.com/demo/image/upload/docuchain/photos/{PHOTO_HASH}.jpg"
+
+
+class _InlinePool:
+    def submit(self, func, *args):
+        return func(*args)
+
+
+def _photo():
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), "navy").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_derivative_id_includes_pixel_size_and_format(monkeypatch):
+    assert images.derivative_id(PHOTO_HASH, "sm") == f"{PHOTO_HASH}_96_webp"
+    monkeypatch.setattr(images, "DERIVATIVE_FORMAT", "AVIF")
+    monkeypatch.setitem(images.DERIVATIVE_SIZES, "sm", 128)
+    assert images.derivative_id(PHOTO_HASH, "sm") == f"{PHOTO_HASH}_128_avif"
+
+
+def test_render_derivatives_respects_sizes():
+    rendered = images.render_derivatives(_photo())
+    for size, pixels in images.DERIVATIVE_SIZES.items():
+        with Image.open(io.BytesIO(rendered[size])) as image:
+            assert max(image.size) == pixels
+            assert image.format == images.DERIVATIVE_FORMAT
+
+
+def test_missing_derivatives_cache_is_bounded(database, monkeypatch):
+    monkeypatch.setattr(images, "_missing", FragmentCache(50))
+    for i in range(500):
+        photo_hash = hashlib.sha256(str(i).encode()).hexdigest()
+        url = f"https://res.cloudinary.com/demo/image/upload/docuchain/photos/{photo_hash}.jpg"
+        assert images.derivative_url(url, "sm") == url
+    assert len(images._missing) == 50
+
+
+def test_missing_entry_is_cleared_when_derivatives_are_scheduled(database, monkeypatch):
+    monkeypatch.setattr(images, "_missing", FragmentCache(50))
+    assert images.derivative_url(PHOTO_URL, "sm") == PHOTO_URL
+    monkeypatch.setattr(images, "_get_pool", _InlinePool)
+    images.schedule_derivatives(b"not an image", PHOTO_HASH)
+    assert images._missing.get(images.derivative_id(PHOTO_HASH, "sm")) is None
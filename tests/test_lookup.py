@@ -0,0 +1,46 @@
+import hashlib
+import io
+
+import pytest
+
+from blockchain import Blockchain, ShardedBlockchain
+
+DOCUMENT = b"%PDF-1.4 diploma"
+DOC_HASH = hashlib.sha256(DOCUMENT).hexdigest()
+CERT_ID = hashlib.md5(("Alice" + DOC_HASH).encode()).hexdigest()[:8].upper()
+
+
+def _issue_twice(blockchain):
+    # A second issuer anchoring the same bytes for the same holder gets the same cert_id
+    blockchain.add_block("Degree", "Real University", DOC_HASH, "Alice", CERT_ID)
+    blockchain.add_block("Degree", "Mallory Inc", DOC_HASH, "Alice", CERT_ID)
+
+
+@pytest.fixture(params=["global", "sharded"])
+def blockchain(request, database):
+    if request.param == "sharded":
+        return ShardedBlockchain()
+    blockchain = Blockchain()
+    blockchain.load_chain()
+    return blockchain
+
+
+def test_earliest_issuance_wins(blockchain):
+    _issue_twice(blockchain)
+    assert blockchain.lookup("document_hash", DOC_HASH).issuer == "Real University"
+    assert blockchain.lookup("cert_id", CERT_ID).issuer == "Real University"
+    assert blockchain.find_document_hash(DOC_HASH).issuer == "Real University"
+
+
+def test_verify_and_qr_routes_show_the_earliest_issuer(database):
+    import app as docuchain
+    docuchain._blockchain = None
+    _issue_twice(docuchain.get_loaded_blockchain())
+    client = docuchain.app.test_client()
+
+    page = client.post("/verify", data={"document": (io.BytesIO(DOCUMENT), "diploma.pdf")},
+                       content_type="multipart/form-data").data
+    assert b"Real University" in page and b"Mallory Inc" not in page
+
+    page = client.get(f"/c/{CERT_ID}").data
+    assert b"Real University" in page and b"Mallory Inc" not in page
@@ -0,0 +1,26 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+import passwords
+
+
+@pytest.mark.parametrize("method", ["scrypt", "scrypt:1024:8:1", "pbkdf2", "pbkdf2:sha512", "pbkdf2:sha256:1000"])
+def test_expanded_method_matches_werkzeug(method):
+    stored = generate_password_hash("secret", method=method).split("$", 1)[0]
+    assert passwords.expanded_method(method) == stored
+
+
+def test_needs_rehash_does_not_hash(monkeypatch):
+    monkeypatch.setattr(passwords, "_run", lambda *args: pytest.fail("hashed a password"))
+    current = generate_password_hash("secret", method=passwords.PASSWORD_HASH_METHOD)
+    assert not passwords.needs_rehash(current)
+    assert passwords.needs_rehash(generate_password_hash("secret", method="pbkdf2:sha256:1000"))
+
+
+def test_login_limiter_stays_bounded():
+    limiter = passwords.LoginLimiter(max_attempts=2, window=60, max_users=100)
+    for i in range(1000):
+        limiter.record_failure(f"user{i}")
+    assert len(limiter._failures) == 100
+    limiter.record_failure("user999")
+    assert limiter.retry_after("user999") > 0
@@ -0,0 +1,28 @@
+import pytest
+
+from blockchain import Blockchain
+
+
+@pytest.fixture
+def block(database):
+    blockchain = Blockchain()
+    blockchain.load_chain()
+    return blockchain.add_block("Degree", "Real University", "ab" * 32, "Alice", "CERT1234")
+
+
+@pytest.fixture
+def qr_url(monkeypatch):
+    import app as docuchain
+    monkeypatch.setattr(docuchain, "make_qr_base64", lambda url: url)
+    return docuchain
+
+
+def test_qr_link_uses_the_scheme_and_host_seen_by_the_proxy(block, qr_url):
+    headers = {"X-Forwarded-Proto": "https", "X-Forwarded-Host": "docuchain.example"}
+    page = qr_url.app.test_client().get("/c/CERT1234", base_url="http://10.0.0.5:8000", headers=headers).data
+    assert b"https://docuchain.example/c/CERT1234" in page
+
+
+def test_qr_link_without_a_proxy(block, qr_url):
+    page = qr_url.app.test_client().get("/c/CERT1234", base_url="http://localhost:5000").data
+    assert b"http://localhost:5000/c/CERT1234" in page
@@ -0,0 +1,135 @@
+import pytest
+
+import blockchain as chain_module
+from blockchain import ANCHOR_DOCUMENT_TYPE, Blockchain, IssuerChain, ShardedBlockchain
+from benchmarks.bench_chain import seed_chain
+
+# Anchor on block count only, so tests don't depend on the clock
+NO_INTERVAL = float("inf")
+
+
+def _issue(sharded, issuer, n, start=0):
+    return [sharded.add_block("Degree", issuer, f"{issuer}-{start + i}".encode().hex(), f"Holder {start + i}")
+            for i in range(n)]
+
+
+def _global_chain():
+    chain = Blockchain()
+    chain.load_chain()
+    return chain
+
+
+def _anchors(database, issuer):
+    return list(database["blockchain"].find({"document_type": ANCHOR_DOCUMENT_TYPE, "issuer": issuer}))
+
+
+@pytest.fixture
+def sharded(database):
+    seed_chain(database["blockchain"], 20)
+    return ShardedBlockchain(anchor_every=3, anchor_interval=NO_INTERVAL)
+
+
+def test_issuing_and_anchoring_keep_both_chains_valid(sharded, database):
+    _issue(sharded, "Uni A", 7)
+    assert [a["cert_id"] for a in _anchors(database, "Uni A")] == ["ANCHOR-3", "ANCHOR-6"]
+    assert sharded.verify_issuer("Uni A")
+    assert _global_chain().verify_chain()
+
+
+def test_anchor_reads_only_the_global_tip(sharded, monkeypatch):
+    monkeypatch.setattr(Blockchain, "load_chain", lambda self: pytest.fail("full chain load"))
+    _issue(sharded, "Uni A", 3)
+    assert sharded.anchor_heads() == []
+
+
+def test_sub_chain_append_retries_after_another_worker(sharded, database, monkeypatch):
+    other_worker = ShardedBlockchain(anchor_every=100, anchor_interval=NO_INTERVAL)
+    original_load_head = IssuerChain.load_head
+    raced = []
+
+    def load_head_then_lose_race(self):
+        head = original_load_head(self)
+        if not raced:
+            raced.append(True)
+            other_worker.add_block("Degree", self.issuer, "aa" * 32, "Raced Holder")
+        return head
+
+    _issue(sharded, "Uni A", 1)
+    monkeypatch.setattr(IssuerChain, "load_head", load_head_then_lose_race)
+    block = sharded.add_block("Degree", "Uni A", "bb" * 32, "Holder")
+    assert block.index == 3
+    assert [b["index"] for b in database["issuer_chains"].find({"issuer": "Uni A"}).sort([("index", 1)])] == [0, 1, 2, 3]
+    assert sharded.verify_issuer("Uni A")
+
+
+def test_concurrent_anchors_get_distinct_global_indexes(sharded, monkeypatch):
+    other_worker = ShardedBlockchain(anchor_every=100, anchor_interval=NO_INTERVAL)
+    _issue(sharded, "Uni A", 1)
+    _issue(other_worker, "Uni B", 1)
+    original_load_head = Blockchain.load_head
+    raced = []
+
+    def load_head_then_lose_race(self):
+        head = original_load_head(self)
+        if not raced:
+            raced.append(True)
+            other_worker.anchor("Uni B")
+        return head
+
+    monkeypatch.setattr(Blockchain, "load_head", load_head_then_lose_race)
+    anchor = sharded.anchor("Uni A")
+    chain = _global_chain()
+    assert anchor.index == chain.chain[-1].index == 21
+    assert chain.verify_chain()
+
+
+def test_stale_anchor_cache_does_not_anchor_twice(sharded, database):
+    other_worker = ShardedBlockchain(anchor_every=3, anchor_interval=NO_INTERVAL)
+    _issue(sharded, "Uni A", 1)
+    assert sharded.last_anchor("Uni A") == (0, 0)
+    _issue(other_worker, "Uni A", 2, start=1)
+    assert len(_anchors(database, "Uni A")) == 1
+    # This worker's cache still says nothing was anchored
+    _issue(sharded, "Uni A", 1, start=3)
+    assert len(_anchors(database, "Uni A")) == 1
+
+
+def test_dashboard_reads_do_not_write(sharded, database):
+    assert sharded.blocks_for_issuer("New Issuer") == []
+    assert database["issuer_chains"].count_documents({}) == 0
+
+
+def test_dashboard_reads_survive_a_database_outage(sharded, monkeypatch):
+    def unreachable():
+        raise ConnectionError("MongoDB is down")
+
+    monkeypatch.setattr(chain_module, "get_blockchain_collection", unreachable)
+    monkeypatch.setattr(chain_module, "get_issuer_chains_collection", unreachable)
+    assert sharded.blocks_for_issuer("Uni A") == []
+    assert sharded.blocks_for_holder("Holder 0") == []
+
+
+def test_blocks_for_issuer_and_holder(sharded, database):
+    _issue(sharded, "Uni A", 2)
+    legacy = database["blockchain"].find_one({"index": 5})
+    issued = [b.index for b in sharded.blocks_for_issuer(legacy["issuer"])]
+    assert 5 in issued
+    assert [b.student_name for b in sharded.blocks_for_issuer("Uni A")] == ["Holder 0", "Holder 1"]
+    assert [b.issuer for b in sharded.blocks_for_holder("Holder 1")] == ["Uni A"]
+
+
+def test_verify_issuer_detects_tampering(sharded, database):
+    _issue(sharded, "Uni A", 4)
+    database["issuer_chains"].update_one({"issuer": "Uni A", "index": 2}, {"$set": {"student_name": "Mallory"}})
+    assert not sharded.verify_issuer("Uni A")
+
+
+def test_verify_issuer_detects_a_rewritten_sub_chain(sharded, database):
+    _issue(sharded, "Uni A", 4)
+    # Rewrite the sub-chain consistently: it verifies on its own but no longer matches its anchor
+    database["issuer_chains"].delete_many({"issuer": "Uni A", "index": {"$gte": 1}})
+    _issue(ShardedBlockchain(anchor_every=100, anchor_interval=NO_INTERVAL), "Uni A", 4, start=10)
+    sub_chain = IssuerChain("Uni A")
+    sub_chain.load_chain()
+    assert sub_chain.verify_chain()
+    assert not sharded.verify_issuer("Uni A")
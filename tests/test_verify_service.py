@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import json
+
+import pytest
+
+import verify_service
+from benchmarks.bench_chain import benchmark_document, seed_chain
+
+BOUNDARY = "testboundary"
+
+
+def _part(disposition, data):
+    return f"--{BOUNDARY}\r\nContent-Disposition: form-data; {disposition}\r\n\r\n".encode() + data + b"\r\n"
+
+
+def _call(path, body=b"", content_type="application/octet-stream", chunk_size=1000):
+    """Drive the ASGI app with ``body`` split into small chunks."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+                for i, c in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"",
+             "headers": [(b"content-type", content_type.encode())]}
+    asyncio.run(verify_service.app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+@pytest.fixture
+def chain(database):
+    seed_chain(database["blockchain"], 20)
+
+
+def test_raw_body(chain):
+    status, result = _call("/api/verify", benchmark_document(3))
+    assert status == 200 and result["verified"]
+
+
+def test_multipart_matches_name_not_filename(chain):
+    document = benchmark_document(3)
+    body = (_part('name="other"; filename="document"', b"decoy")
+            + _part('name="document"; filename="diploma.pdf"', document)
+            + f"--{BOUNDARY}--\r\n".encode())
+    status, result = _call("/api/verify", body, f"multipart/form-data; boundary={BOUNDARY}")
+    assert status == 200 and result["verified"]
+    assert result["document_hash"] == hashlib.sha256(document).hexdigest()
+
+
+def test_multipart_without_document_field(chain):
+    body = _part('name="other"', b"1") + f"--{BOUNDARY}--\r\n".encode()
+    status, _ = _call("/api/verify", body, f"multipart/form-data; boundary={BOUNDARY}")
+    assert status == 400
+
+
+def test_duplicate_issuance_resolves_to_the_earliest_block(chain, database):
+    first = database["blockchain"].find_one({"index": 3})
+    duplicate = {k: v for k, v in first.items() if k != "_id"}
+    duplicate.update(index=10_000, issuer="Mallory Inc")
+    database["blockchain"].insert_one(duplicate)
+    status, result = _call("/api/verify", benchmark_document(3))
+    assert status == 200 and result["block"]["issuer"] == first["issuer"]
@@ -0,0 +1,284 @@
+"""Asyncio serving path for the public, read-only verification API.
+
+The Flask app runs on gthread workers, so each worker has at most --threads
+requests in flight and a slow upload or database read holds a thread for its
+whole duration. Verification traffic is almost entirely waiting on the client
+and on MongoDB, so this module serves it from an event loop instead: uploads
+are read without blocking, Mongo is queried with pymongo's AsyncMongoClient
+and only the SHA-256 work runs on a small thread pool. It is a plain ASGI
+application with no framework, served by gunicorn's own asyncio worker as a
+separate web service next to the Flask app (see render.yaml):
+
+    gunicorn verify_service:app --worker-class asgi --worker-connections 4000
+
+Routes (JSON responses):
+
+    GET  /api/health
+    POST /api/verify               raw file body, or multipart with a "document" field
+    GET  /api/document/<doc_hash>
+    GET  /api/c/<cert_id>?s=<signed QR hash prefix>
+
+It reads the same collections as blockchain.py (including the per-issuer
+sub-chains in sharded mode) but never writes; indexes are created by the
+Flask app.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote
+
+from blockchain import NON_DOCUMENT_TYPES
+from db import get_async_db
+from qr_links import check_qr_link
+
+log = logging.getLogger(__name__)
+
+VERIFY_MAX_UPLOAD_BYTES = int(os.environ.get('VERIFY_MAX_UPLOAD_BYTES', 32 * 1024 * 1024))
+VERIFY_HASH_WORKERS = int(os.environ.get('VERIFY_HASH_WORKERS', 4))
+# Upload bytes are buffered up to this size before being hashed off-loop;
+# hashlib releases the GIL for large updates so the pool threads run in parallel
+HASH_CHUNK_BYTES = 256 * 1024
+MULTIPART_MAX_PARTS = 16
+
+_hash_pool = ThreadPoolExecutor(max_workers=VERIFY_HASH_WORKERS, thread_name_prefix="verify-hash")
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Lookups (async mirrors of Blockchain.lookup / ShardedBlockchain.lookup)
+# ---------------------------------------------------------------------------
+
+async def lookup(field, value):
+    # Earliest record wins, as in Blockchain.lookup
+    database = get_async_db()
+    docs = await database['blockchain'].find(
+        {field: value, "document_type": {"$nin": NON_DOCUMENT_TYPES}}).sort([("index", 1)]).limit(1).to_list(1)
+    if not docs and os.environ.get('DOCUCHAIN_SHARDED') == '1':
+        docs = await database['issuer_chains'].find(
+            {field: value, "document_type": {"$ne": "Genesis"}}).sort([("timestamp", 1)]).limit(1).to_list(1)
+    return docs[0] if docs else None
+
+
+def public_block(doc):
+    doc = dict(doc)
+    doc.pop('_id', None)
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Request body handling
+# ---------------------------------------------------------------------------
+
+class IncrementalHash:
+    """SHA-256 fed as data arrives; large runs of bytes are hashed off-loop."""
+
+    def __init__(self):
+        self._sha = hashlib.sha256()
+        self._pending = bytearray()
+
+    async def _flush(self):
+        data = bytes(self._pending)
+        self._pending.clear()
+        if len(data) >= HASH_CHUNK_BYTES:
+            await asyncio.get_running_loop().run_in_executor(_hash_pool, self._sha.update, data)
+        else:
+            self._sha.update(data)
+
+    async def update(self, data):
+        self._pending += data
+        if len(self._pending) >= HASH_CHUNK_BYTES:
+            await self._flush()
+
+    async def hexdigest(self):
+        await self._flush()
+        return self._sha.hexdigest()
+
+
+async def iter_body(receive):
+    """Yield request body chunks as they arrive, enforcing the upload limit."""
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        size += len(chunk)
+        if size > VERIFY_MAX_UPLOAD_BYTES:
+            raise RequestTooLarge()
+        yield chunk
+
+
+async def hash_raw_body(receive):
+    """SHA-256 of the request body, hashed incrementally as it arrives."""
+    sha = IncrementalHash()
+    async for chunk in iter_body(receive):
+        await sha.update(chunk)
+    return await sha.hexdigest()
+
+
+async def hash_multipart_field(receive, content_type, field):
+    """SHA-256 of form field ``field`` in a multipart body, or None if absent.
+
+    The body is parsed as it streams in, so only the parser's small lookahead
+    buffer is held in memory whatever the upload size.
+    """
+    from werkzeug.http import parse_options_header
+    from werkzeug.sansio.multipart import Data, Epilogue, File, Field, MultipartDecoder, NeedData
+
+    boundary = parse_options_header(content_type)[1].get('boundary')
+    if not boundary:
+        raise ValueError("multipart body without a boundary")
+    decoder = MultipartDecoder(boundary.encode(), max_form_memory_size=64 * 1024, max_parts=MULTIPART_MAX_PARTS)
+
+    sha = None
+    in_field = done = False
+    chunks = iter_body(receive)
+    while True:
+        event = decoder.next_event()
+        if isinstance(event, NeedData):
+            try:
+                decoder.receive_data(await chunks.__anext__())
+            except StopAsyncIteration:
+                decoder.receive_data(None)
+            continue
+        if isinstance(event, Epilogue):
+            break
+        if isinstance(event, (File, Field)):
+            in_field = not done and event.name == field
+            if in_field:
+                sha = IncrementalHash()
+        elif isinstance(event, Data) and in_field:
+            await sha.update(event.data)
+            if not event.more_data:
+                in_field, done = False, True
+
+    return await sha.hexdigest() if done else None
+
+
+# ---------------------------------------------------------------------------
+# Handlers
+# ---------------------------------------------------------------------------
+
+async def verify(scope, receive):
+    content_type = _header(scope, b'content-type')
+    if content_type.startswith('multipart/form-data'):
+        from werkzeug.exceptions import RequestEntityTooLarge
+        try:
+            document_hash = await hash_multipart_field(receive, content_type, 'document')
+        except ValueError:
+            return 400, {"error": "Malformed multipart body."}
+        except RequestEntityTooLarge:
+            raise RequestTooLarge()
+        if document_hash is None:
+            return 400, {"error": "No file uploaded. Send the file in a 'document' form field."}
+    else:
+        document_hash = await hash_raw_body(receive)
+
+    block = await lookup('document_hash', document_hash)
+    return 200, {
+        "verified": block is not None,
+        "document_hash": document_hash,
+        "block": public_block(block) if block else None,
+    }
+
+
+async def document(doc_hash):
+    block = await lookup('document_hash', doc_hash)
+    if not block:
+        return 404, {"error": "Document not found in the blockchain."}
+    return 200, {"verified": True, "block": public_block(block)}
+
+
+async def resolve_cert(cert_id, query):
+    block = await lookup('cert_id', cert_id)
+    signature_valid = None
+    token = query.get('s', [None])[0]
+    if token:
+        prefix = check_qr_link(cert_id, token)
+        signature_valid = prefix is not None
+        if signature_valid and block and not block['document_hash'].startswith(prefix):
+            return 409, {"error": "The on-chain record for this ID does not match the QR code.",
+                         "signature_valid": True}
+    if not block:
+        return 404, {"error": "No document with this certificate ID.", "signature_valid": signature_valid}
+    return 200, {"verified": True, "signature_valid": signature_valid, "block": public_block(block)}
+
+
+# ---------------------------------------------------------------------------
+# ASGI plumbing
+# ---------------------------------------------------------------------------
+
+def _header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"cache-control", b"no-store"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({"type": "lifespan.startup.complete"})
+        elif message['type'] == 'lifespan.shutdown':
+            import db
+            if db._async_client is not None:
+                await db._async_client.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def route(scope, receive):
+    method = scope['method']
+    path = scope['path']
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+
+    if path == '/api/health':
+        return 200, {"status": "ok"}
+    if path == '/api/verify':
+        if method != 'POST':
+            return 405, {"error": "Use POST."}
+        return await verify(scope, receive)
+    if method not in ('GET', 'HEAD'):
+        return 405, {"error": "Use GET."}
+    if path.startswith('/api/document/'):
+        return await document(unquote(path[len('/api/document/'):]))
+    if path.startswith('/api/c/'):
+        return await resolve_cert(unquote(path[len('/api/c/'):]), query)
+    return 404, {"error": "Not found."}
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    try:
+        status, payload = await route(scope, receive)
+    except RequestTooLarge:
+        status, payload = 413, {"error": "File too large."}
+    except Exception:
+        log.exception("Error handling %s %s", scope.get('method'), scope.get('path'))
+        status, payload = 500, {"error": "Internal server error."}
+    await _send_json(send, status, payload)